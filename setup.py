@@ -49,6 +49,13 @@ setup(
             "openai>=1.0.0,<2.0.0",  # Pin to v1.x with upper bound
             "requests>=2.32.0,<3.0.0",  # Updated to latest secure version
         ],
+        "fast": [
+            "pyahocorasick>=2.0.0,<3.0.0",  # Single-pass keyword matching
+            "orjson>=3.8.0,<4.0.0",  # Faster JSON export and LLM response parsing
+        ],
+        "re2": [
+            "google-re2>=1.1,<2.0",  # Linear-time regex engine
+        ],
         "dev": [
             "pytest>=8.0.0,<9.0.0",  # Updated to latest
             "black>=24.0.0,<25.0.0",  # Updated to latest
@@ -2,8 +2,10 @@
 Tests for TicketCategory
 """
 
+import sys
 import pytest
-from ticket_classifier.categories import TicketCategory, DEFAULT_CATEGORIES
+from ticket_classifier.categories import TicketCategory, DEFAULT_CATEGORIES, build_global_union, build_keyword_automaton
+from ticket_classifier.classifier import TicketClassifier
 
 
 class TestTicketCategory:
@@ -45,8 +47,8 @@ class TestTicketCategory:
             assert hasattr(category, 'priority')
             assert hasattr(category, 'auto_resolvable')
 
-            assert isinstance(category.keywords, list)
-            assert isinstance(category.patterns, list)
+            assert isinstance(category.keywords, tuple)
+            assert isinstance(category.patterns, tuple)
             assert category.priority in ['low', 'medium', 'high', 'critical']
             assert isinstance(category.auto_resolvable, bool)
 
@@ -63,3 +65,236 @@ class TestTicketCategory:
 
         repr_str = repr(category)
         assert "test" in repr_str
+
+    def test_patterns_are_precompiled(self):
+        """Test that patterns are compiled once at construction"""
+        category = TicketCategory(
+            name="test",
+            description="Test category",
+            keywords=[],
+            patterns=[r"foo.*bar", r"baz"]
+        )
+
+        assert [cp.pattern for cp in category.compiled_patterns] == [r"foo.*bar", r"baz"]
+        assert category.combined_pattern.search("FOO and BAR")
+        assert category.combined_pattern.search("nothing here") is None
+
+    def test_invalid_pattern_is_skipped(self):
+        """Test that invalid regex patterns are dropped instead of raising"""
+        category = TicketCategory(
+            name="test",
+            description="Test category",
+            keywords=[],
+            patterns=[r"valid", r"(unclosed"]
+        )
+
+        assert [cp.pattern for cp in category.compiled_patterns] == [r"valid"]
+
+    def test_backreference_patterns_not_combined(self):
+        """Test that patterns with backreferences are not merged into a union"""
+        category = TicketCategory(
+            name="test",
+            description="Test category",
+            keywords=[],
+            patterns=[r"(\w+) \1"]
+        )
+
+        assert category.combined_pattern is None
+        assert build_global_union([category]) is None
+
+    def test_conditional_patterns_not_combined(self):
+        """Test that numbered conditionals keep their group numbers"""
+        category = TicketCategory("y", "Test category", [], [r"(x)z", r"(a)?(?(1)b|c)"])
+
+        assert category.combined_pattern is None
+        assert build_global_union([category]) is None
+
+        classifier = TicketClassifier(categories=[category])
+        assert classifier.classify("ab").category.name == "y"
+        assert classifier.classify("ab").matched_patterns == [r"(a)?(?(1)b|c)"]
+
+    def test_inline_flag_patterns_not_combined(self):
+        """Test that a global inline flag does not leak into other patterns"""
+        category = TicketCategory("y", "Test category", [], [r"a b", r"(?x) q r"])
+
+        assert category.combined_pattern is None
+        assert build_global_union([category]) is None
+
+        classifier = TicketClassifier(categories=[category])
+        assert classifier.classify("a b", threshold=0.0).matched_patterns == [r"a b"]
+        assert classifier.classify("qr", threshold=0.0).matched_patterns == [r"(?x) q r"]
+
+    def test_build_global_union(self):
+        """Test that the global union reports the matching category index"""
+        match = build_global_union(DEFAULT_CATEGORIES).search("i forgot my password")
+
+        assert match is not None
+        assert DEFAULT_CATEGORIES[int(match.lastgroup[1:])].name == "password_reset"
+
+    def test_build_keyword_automaton(self):
+        """Test that shared keywords map to every owning category"""
+        pytest.importorskip("ahocorasick")
+
+        automaton = build_keyword_automaton(DEFAULT_CATEGORIES)
+        hits = {keyword: owners for _, (keyword, owners) in automaton.iter("outlook error")}
+
+        names = {DEFAULT_CATEGORIES[i].name for i, _ in hits["outlook"]}
+        assert names == {"email_issue", "application_error"}
+        assert "error" in hits
+
+    def test_category_is_immutable(self):
+        """Test that categories are frozen, hashable and store tuples"""
+        category = TicketCategory(
+            name="test",
+            description="Test category",
+            keywords=["Test"],
+            patterns=[r"test"]
+        )
+
+        assert category.keywords == ("Test",)
+        assert category.keywords_lower == ("test",)
+        assert category.patterns == (r"test",)
+        assert hash(category) == hash(TicketCategory("test", "Test category", ("Test",), (r"test",)))
+
+        with pytest.raises(AttributeError):
+            category.name = "changed"
+
+    def test_literal_patterns_detected(self):
+        """Test that metacharacter-free patterns are flagged as literals"""
+        category = TicketCategory(
+            name="test",
+            description="Test category",
+            keywords=[],
+            patterns=[r"Spooler", r"paper.*jam", r"m365"]
+        )
+
+        assert category.pattern_literals == ("spooler", None, "m365")
+
+    def test_ascii_pattern_variants(self):
+        """Test that ASCII variants exist only where they are equivalent"""
+        import re
+
+        category = TicketCategory(
+            name="test",
+            description="Test category",
+            keywords=[],
+            patterns=[r"disk.*full", r"caf[eé]"]
+        )
+
+        assert category.ascii_patterns[0].flags & re.ASCII
+        assert category.ascii_patterns[1] is category.compiled_patterns[1]
+        assert category.ascii_combined_pattern is None
+        assert category.combined_pattern.search("CAFÉ")
+
+    def test_unsafe_constructor(self):
+        """Test that unsafe() builds an equivalent category without validation"""
+        checked = TicketCategory("test", "Test category", ["Test"], [r"te+st"], "high", True)
+        unchecked = TicketCategory.unsafe("test", "Test category", ["Test"], [r"te+st"], "high", True)
+
+        assert unchecked == checked
+        assert unchecked.keywords_lower == ("test",)
+        assert unchecked.compiled_patterns[0].search("TEEST")
+
+        # Invalid values are accepted as-is
+        assert TicketCategory.unsafe("test", "Test category", [], [], priority="urgent").priority == "urgent"
+
+    def test_validation_under_optimize_flag(self):
+        """Test that the constructor still validates under python -O, and unsafe() does not"""
+        import os
+        import subprocess
+        import textwrap
+
+        script = textwrap.dedent("""
+            from ticket_classifier.categories import TicketCategory
+
+            checks = [
+                lambda: TicketCategory("t", "d", "printer", []),
+                lambda: TicketCategory("t", "d", ["a", "b"], [], keyword_weights=[1.0]),
+                lambda: TicketCategory("t", "d", [], [], priority="urgent"),
+            ]
+            for check in checks:
+                try:
+                    check()
+                except (TypeError, ValueError):
+                    continue
+                raise SystemExit("accepted invalid category")
+
+            assert TicketCategory.unsafe("t", "d", [], [], priority="urgent").priority == "urgent"
+        """)
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        completed = subprocess.run([sys.executable, "-O", "-c", script], cwd=root,
+                                   capture_output=True, text=True)
+
+        assert completed.returncode == 0, completed.stdout + completed.stderr
+
+    def test_name_and_priority_interned(self):
+        """Test that runtime-built names and priorities are interned"""
+        name = "".join(["dyn", "amic"])
+        priority = "".join(["hi", "gh"])
+        category = TicketCategory(name, "Test category", [], [], priority)
+
+        assert category.name is sys.intern("dynamic")
+        assert category.priority is sys.intern("high")
+
+    def test_patterns_interned(self):
+        """Test that equal patterns from separate categories share one string"""
+        first = TicketCategory("a", "A", [], ["".join(["print", "er.*jam"])])
+        second = TicketCategory("b", "B", [], ["".join(["printer", ".*jam"])])
+
+        assert first.patterns[0] is second.patterns[0]
+        assert first.compiled_patterns[0].pattern is first.patterns[0]
+
+    def test_keyword_weights(self):
+        """Test keyword weight defaults and validation"""
+        category = TicketCategory("test", "Test category", ["a", "b"], [])
+        assert category.keyword_weights == (1.0, 1.0)
+
+        weighted = TicketCategory("test", "Test category", ["a", "b"], [], keyword_weights=[2, 0.5])
+        assert weighted.keyword_weights == (2.0, 0.5)
+
+        with pytest.raises(ValueError, match="one weight per keyword"):
+            TicketCategory("test", "Test category", ["a", "b"], [], keyword_weights=[1.0])
+        with pytest.raises(TypeError, match="must be numeric"):
+            TicketCategory("test", "Test category", ["a"], [], keyword_weights=["1"])
+        with pytest.raises(ValueError, match="cannot be negative"):
+            TicketCategory("test", "Test category", ["a"], [], keyword_weights=[-1.0])
+
+    def test_merge_common_prefixes(self):
+        """Test that prefix merging keeps match existence and leftmost start"""
+        import re
+        from ticket_classifier.categories import _merge_common_prefixes
+
+        patterns = [r"can'?t.*print", r"can'?t.*connect", r"print", r"printer.*jam", r"a|b", r"x*y", r"spooler"]
+        merged = _merge_common_prefixes(patterns)
+        assert merged.count("can") == 1
+        assert "printer" not in merged  # absorbed by the literal "print"
+
+        merged_re = re.compile(merged, re.IGNORECASE)
+        union_re = re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE)
+        for text in ["cant connect", "Can't PRINT now", "the printer jammed", "zzz a", "xxy",
+                     "nothing here", "spooler", "c", ""]:
+            expected = union_re.search(text)
+            actual = merged_re.search(text)
+            assert (actual is None) == (expected is None)
+            if expected is not None:
+                assert actual.start() == expected.start()
+
+    def test_ascii_patterns_skip_case_folding(self):
+        """Test that only patterns safe on lowercase text drop IGNORECASE"""
+        import re
+
+        patterns = [r"printer.*jam", r"VPN", r"[!-_]x", r"\x41b", r"\S+down"]
+        category = TicketCategory("test", "Test category", [], patterns)
+        folded = [bool(p.flags & re.IGNORECASE) for p in category.ascii_patterns]
+
+        assert folded == [False, True, True, True, True]
+        assert category.ascii_combined_pattern.flags & re.IGNORECASE
+
+        plain = TicketCategory("plain", "Plain category", [], [r"printer.*jam", r"disk\s+full"])
+        assert not plain.ascii_combined_pattern.flags & re.IGNORECASE
+        assert not build_global_union([plain], ascii=True).flags & re.IGNORECASE
+        assert build_global_union([plain, category], ascii=True).flags & re.IGNORECASE
+
+        for text in ["printer jam", "my vpn", "ax", "ab", "is down"]:
+            for ascii_cp, cp in zip(category.ascii_patterns, category.compiled_patterns):
+                assert bool(ascii_cp.search(text)) == bool(cp.search(text))
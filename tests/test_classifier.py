@@ -3,7 +3,8 @@ Tests for TicketClassifier
 """
 
 import pytest
-from ticket_classifier import TicketClassifier, TicketCategory
+from ticket_classifier import TicketClassifier, TicketCategory, ClassificationResult, dump_results_jsonl
+from ticket_classifier.classifier import _combine_scores, _PATTERN_SATURATION, _KEYWORD_SATURATION
 
 
 class TestTicketClassifier:
@@ -117,6 +118,29 @@ class TestTicketClassifier:
         assert "auto_resolvable" in result_dict
         assert isinstance(result_dict["confidence"], (int, float))
 
+    def test_classification_result_is_slotted(self):
+        """Test that results carry no per-instance __dict__"""
+        result = TicketClassifier().classify("I forgot my password")
+
+        assert not hasattr(result, "__dict__")
+        with pytest.raises(AttributeError):
+            result.extra = 1
+
+    def test_internal_results_match_validated_results(self):
+        """Test that results built without validation equal validated ones"""
+        classifier = TicketClassifier()
+        for text in ["I forgot my password", "printer jam", "", "xyz abc"]:
+            result = classifier.classify(text)
+            checked = ClassificationResult(result.category, result.confidence, result.matched_patterns)
+
+            assert type(result.confidence) is float
+            assert isinstance(result.matched_patterns, list)
+            assert checked.confidence == result.confidence
+            assert checked.to_dict() == result.to_dict()
+
+        with pytest.raises(ValueError):
+            ClassificationResult(classifier.categories[0], 1.5, [])
+
     def test_empty_ticket(self):
         """Test classification of empty ticket"""
         classifier = TicketClassifier()
@@ -130,3 +154,310 @@ class TestTicketClassifier:
 
         result = classifier.classify("xyz abc random words")
         assert result.category.name == "other"
+
+    def test_add_category_does_not_modify_defaults(self):
+        """Test that adding a category leaves DEFAULT_CATEGORIES untouched"""
+        from ticket_classifier import DEFAULT_CATEGORIES
+
+        classifier = TicketClassifier()
+        classifier.add_category(TicketCategory(
+            name="isolated_category",
+            description="Test category",
+            keywords=[],
+            patterns=[r"isolated"]
+        ))
+
+        assert all(c.name != "isolated_category" for c in DEFAULT_CATEGORIES)
+        assert classifier.classify("isolated").category.name == "isolated_category"
+
+    def test_combine_scores(self):
+        """Test score weighting, boosts and clamping"""
+        assert _combine_scores(0, 0) == 0.0
+        assert _combine_scores(1, 0) == 0.5
+        assert _combine_scores(0, 2) == pytest.approx(0.2)
+        assert _combine_scores(0, 10) == pytest.approx(0.55)
+        assert _combine_scores(2, 0) == 1.0
+        assert _combine_scores(5, 10) == 1.0
+
+    def test_score_saturation_points(self):
+        """Test that counting past the saturation points cannot change a score"""
+        for keywords in range(20):
+            assert _combine_scores(_PATTERN_SATURATION, keywords) == _combine_scores(_PATTERN_SATURATION, 0)
+        for patterns in range(_PATTERN_SATURATION):
+            for keywords in (5, 5.5, 7.0, 20):
+                assert _combine_scores(patterns, keywords) == _combine_scores(patterns, _KEYWORD_SATURATION)
+
+    def test_combine_scores_clamping(self):
+        """Test the inline clamps against step-by-step min() clamping"""
+        def reference(patterns, keywords):
+            score = min(min(patterns * 0.5, 1.0) + min(keywords * 0.1, 0.5), 1.0)
+            if patterns >= 2:
+                score = min(score + 0.1, 1.0)
+            if keywords >= 3:
+                score = min(score + 0.05, 1.0)
+            return score
+
+        for patterns in range(5):
+            for keywords in [0, 1, 2, 3, 4, 5, 6, 10, 0.5, 2.5, 2.95, 3.0, 4.75, 12.5]:
+                score = _combine_scores(patterns, keywords)
+                assert score == reference(patterns, keywords)
+                assert type(score) is float
+
+    def test_result_cache(self):
+        """Test that repeated tickets are served from the cache"""
+        classifier = TicketClassifier()
+
+        first = classifier.classify("I forgot my password")
+        first.matched_patterns.append("mutated")
+        second = classifier.classify("I FORGOT my password")
+
+        info = classifier.cache_info()
+        assert info.hits == 1
+        assert info.misses == 1
+        assert info.currsize == 1
+        assert second.category.name == "password_reset"
+        assert "mutated" not in second.matched_patterns
+
+        classifier.cache_clear()
+        assert classifier.cache_info() == (0, 0, 4096, 0)
+
+    def test_result_cache_invalidated_by_add_category(self):
+        """Test that adding a category invalidates cached results"""
+        classifier = TicketClassifier()
+        assert classifier.classify("quantum flux").category.name == "other"
+
+        classifier.add_category(TicketCategory(
+            name="flux",
+            description="Test category",
+            keywords=[],
+            patterns=[r"quantum\s+flux"]
+        ))
+
+        assert classifier.classify("quantum flux").category.name == "flux"
+
+    def test_result_cache_disabled(self):
+        """Test that cache_size=0 disables caching"""
+        classifier = TicketClassifier(cache_size=0)
+        classifier.classify("I forgot my password")
+        classifier.classify("I forgot my password")
+
+        assert classifier.cache_info() == (0, 0, 0, 0)
+
+        with pytest.raises(ValueError):
+            TicketClassifier(cache_size=-1)
+
+    def test_early_exit(self):
+        """Test that early exit still picks saturated categories"""
+        classifier = TicketClassifier(cache_size=0, early_exit=True)
+
+        for _ in range(300):
+            assert classifier.classify("Printer not working, printer down").category.name == "printer_issue"
+        assert classifier.categories[classifier._evaluation_order[0]].name == "printer_issue"
+
+        result = classifier.classify("I forgot my password and can't log in")
+        assert result.category.name == "password_reset"
+        assert result.confidence == 1.0
+        assert classifier.classify("xyz abc random words").category.name == "other"
+
+    def test_shared_across_threads(self):
+        """Test that one classifier can be used from several threads"""
+        from concurrent.futures import ThreadPoolExecutor
+
+        classifier = TicketClassifier(cache_size=4)
+        tickets = ["Printer not working", "I forgot my password", "My disk is full",
+                   "VPN not working", "Excel keeps crashing", "I need access to the share folder"] * 200
+        expected = [classifier.classify(t).category.name for t in tickets[:6]] * 200
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            names = [r.category.name for r in executor.map(classifier.classify, tickets)]
+
+        assert names == expected
+        assert classifier.cache_info().currsize <= 4
+
+    def test_dump_results_jsonl(self, tmp_path, monkeypatch):
+        """Test writing results as JSON Lines with and without orjson"""
+        import json
+        import ticket_classifier.classifier as classifier_module
+
+        classifier = TicketClassifier()
+        results = classifier.classify_batch(["Printer not working", "I forgot my password"])
+        expected = [r.to_dict() for r in results]
+
+        path = tmp_path / "results.jsonl"
+        assert dump_results_jsonl(results, str(path)) == 2
+        assert [json.loads(line) for line in path.read_text().splitlines()] == expected
+
+        monkeypatch.setattr(classifier_module, "orjson", None)
+        assert dump_results_jsonl(iter(results), str(path)) == 2
+        assert [json.loads(line) for line in path.read_text().splitlines()] == expected
+
+    def test_keyword_weights(self, monkeypatch):
+        """Test that weighted keywords change the keyword score"""
+        import ticket_classifier.classifier as classifier_module
+        from collections import OrderedDict
+
+        def make_classifier(weights):
+            classifier = TicketClassifier(cache_size=0)
+            classifier.add_category(TicketCategory(
+                name="weighted", description="Weighted keywords",
+                keywords=["zorb", "quux"], patterns=[], keyword_weights=weights,
+            ))
+            return classifier
+
+        ticket = "zorb and quux"
+        for use_automaton in (True, False):
+            if not use_automaton:
+                monkeypatch.setattr(classifier_module, "build_keyword_automaton", lambda categories: None)
+                monkeypatch.setattr(TicketClassifier, "_index_cache", OrderedDict())
+            assert make_classifier(None).classify(ticket, threshold=0.0).confidence == pytest.approx(0.2)
+            assert make_classifier([3.0, 1.0]).classify(ticket, threshold=0.0).confidence == pytest.approx(0.45)
+
+    def test_pattern_checks_after_gate_match(self):
+        """Test that anchors and lookbehinds still see text before the first match"""
+        import re
+
+        patterns = [r"cd", r"(?<=ab)c", r"^ab", r"\bcd", r"d$", r"xyz"]
+        classifier = TicketClassifier(cache_size=0)
+        classifier.add_category(TicketCategory("anchored", "Anchored patterns", [], patterns))
+
+        for ticket in ["abcd", "zz abcd", "ab cd", "cd ab", "abcdé"]:
+            expected = [p for p in patterns if re.search(p, ticket.lower(), re.IGNORECASE)]
+            result = classifier.classify(ticket, threshold=0.0)
+            assert result.category.name == "anchored"
+            assert result.matched_patterns == expected
+
+    def test_regex_engine_validation(self):
+        """Test regex_engine argument checks"""
+        with pytest.raises(TypeError):
+            TicketClassifier(regex_engine=None)
+        with pytest.raises(ValueError):
+            TicketClassifier(regex_engine="pcre")
+
+    def test_compiled_index_shared(self):
+        """Test that classifiers with equal categories share one compiled index"""
+        first = TicketClassifier()
+        second = TicketClassifier(early_exit=True)
+
+        assert second._match_plans is first._match_plans
+        assert second._keyword_automaton is first._keyword_automaton
+        assert second._wins is not first._wins
+
+        second.add_category(TicketCategory("flux", "Test category", [], [r"quantum\s+flux"]))
+        assert second._match_plans is not first._match_plans
+        assert first.classify("quantum flux").category.name == "other"
+        assert second.classify("quantum flux").category.name == "flux"
+
+        second.remove_category("flux")
+        assert second._match_plans is first._match_plans
+
+    def test_normalize_whitespace(self):
+        """Test that whitespace runs are collapsed only when requested"""
+        category = TicketCategory(
+            name="login",
+            description="Test category",
+            keywords=["log in", "sign in", "account locked"],
+            patterns=[]
+        )
+        text = "Cannot log\n  in or\tsign   in,  account\r\nlocked"
+
+        plain = TicketClassifier(categories=[category])
+        normalized = TicketClassifier(categories=[category], normalize_whitespace=True)
+
+        assert plain.classify(text, threshold=0.0).confidence == 0.0
+        assert normalized.classify(text, threshold=0.0).confidence == pytest.approx(0.35)
+        assert normalized.classify_batch([text, "log in"], threshold=0.0)[0].confidence == pytest.approx(0.35)
+
+        with pytest.raises(TypeError):
+            TicketClassifier(normalize_whitespace=1)
+
+    def test_re2_engine(self):
+        """Test that the RE2 engine gives the same results and stays linear"""
+        pytest.importorskip("re2")
+
+        classifier = TicketClassifier(regex_engine="re2")
+        reference = TicketClassifier()
+        tickets = ["I forgot my password and can't log in", "Printer not working", "My monitor is broken",
+                   "Outlook keeps crashing", "VPN not working from home", "xyz abc random words"]
+        for ticket in tickets:
+            result, expected = classifier.classify(ticket), reference.classify(ticket)
+            assert result.category.name == expected.category.name
+            assert result.confidence == expected.confidence
+            assert result.matched_patterns == expected.matched_patterns
+
+        # Backtracks for a very long time in the stdlib engine
+        assert classifier.classify("this is " * 600).category.name == "other"
+
+    def test_batch_deduplicates_tickets(self, monkeypatch):
+        """Test that identical tickets in one batch are matched once"""
+        classifier = TicketClassifier(cache_size=0)
+        calls = []
+        original = classifier._best_match
+        monkeypatch.setattr(classifier, "_best_match", lambda text: calls.append(text) or original(text))
+
+        results = classifier.classify_batch(["Printer not working", "VPN down", "Printer not working"])
+
+        assert len(calls) == 2
+        assert results[0].category.name == results[2].category.name == "printer_issue"
+        assert results[0] is not results[2]
+        assert results[0].matched_patterns is not results[2].matched_patterns
+
+    def test_result_cache_long_ticket_key(self):
+        """Test that long tickets are cached under a compact digest"""
+        classifier = TicketClassifier()
+        ticket = "Printer not working. " + "Please help. " * 50
+
+        first = classifier.classify(ticket)
+        second = classifier.classify(ticket.upper())
+
+        assert classifier.cache_info().hits == 1
+        assert second.category.name == first.category.name == "printer_issue"
+        assert all(isinstance(key, bytes) and len(key) == 16 for key in classifier._cache)
+
+    def test_best_match_ties_and_zero_scores(self):
+        """Test that ties go to the earliest category, as with a stable sort"""
+        first = TicketCategory("first", "First", ["zorb"], [])
+        second = TicketCategory("second", "Second", ["zorb"], [])
+        other = TicketCategory("other", "Other", [], [])
+        classifier = TicketClassifier([first, second, other], cache_size=0)
+
+        assert classifier.classify("zorb", threshold=0.0).category.name == "first"
+        # Nothing matches: the first category wins with 0.0, then the threshold applies
+        assert classifier.classify("nothing", threshold=0.0).category.name == "first"
+        assert classifier.classify("nothing").category.name == "other"
+
+        classifier = TicketClassifier([other, first], cache_size=0)
+        assert classifier.classify("nothing", threshold=0.0).category.name == "other"
+
+    def test_batch_with_worker_processes(self):
+        """Test that a multi-process batch matches a serial one"""
+        from ticket_classifier.classifier import MIN_PARALLEL_BATCH
+
+        classifier = TicketClassifier()
+        tickets = ["Printer not working", "I forgot my password", "My disk is full",
+                   "xyz abc random words", "Outlook keeps crashing"]
+        tickets = (tickets * MIN_PARALLEL_BATCH)[:MIN_PARALLEL_BATCH]
+
+        serial = classifier.classify_batch(tickets)
+        parallel = classifier.classify_batch(tickets, workers=2)
+
+        assert [r.category for r in parallel] == [r.category for r in serial]
+        assert [r.confidence for r in parallel] == [r.confidence for r in serial]
+        assert [r.matched_patterns for r in parallel] == [r.matched_patterns for r in serial]
+        assert all(r.category in classifier.categories for r in parallel)
+
+        with pytest.raises(ValueError):
+            classifier.classify_batch(tickets, workers=-1)
+        with pytest.raises(TypeError):
+            classifier.classify_batch(tickets, workers=2.0)
+
+    def test_batch_shares_case_variants(self, monkeypatch):
+        """Test that tickets differing only in case are matched once per batch"""
+        classifier = TicketClassifier(cache_size=0)
+        calls = []
+        original = classifier._best_match
+        monkeypatch.setattr(classifier, "_best_match", lambda text: calls.append(text) or original(text))
+
+        results = classifier.classify_batch(["Printer not working", "PRINTER NOT WORKING", "printer not working"])
+
+        assert calls == ["printer not working"]
+        assert {r.category.name for r in results} == {"printer_issue"}
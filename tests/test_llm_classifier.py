@@ -0,0 +1,414 @@
+"""
+Tests for LLMClassifier
+"""
+
+import asyncio
+import pytest
+from ticket_classifier import LLMClassifier
+
+
+def fake_llm(ticket_text):
+    """Stand-in for _call_llm that answers based on the ticket text"""
+    if "password" in ticket_text:
+        return {"category": "password_reset", "confidence": 0.9, "reasoning": "mentions password"}
+    return {"category": "printer_issue", "confidence": 0.8, "reasoning": "mentions printer"}
+
+
+class TestLLMClassifier:
+    """Test LLMClassifier without making network calls"""
+
+    def test_classify_batch(self, monkeypatch):
+        """Test that concurrent batch classification preserves order"""
+        classifier = LLMClassifier(provider="local")
+        monkeypatch.setattr(classifier, "_call_llm", fake_llm)
+
+        results = classifier.classify_batch(["forgot password", "printer jam", "password again"], concurrency=2)
+
+        assert [r.category.name for r in results] == ["password_reset", "printer_issue", "password_reset"]
+
+    def test_classify_batch_async(self, monkeypatch):
+        """Test the asyncio batch entry point"""
+        classifier = LLMClassifier(provider="local")
+        monkeypatch.setattr(classifier, "_call_llm", fake_llm)
+
+        results = asyncio.run(classifier.classify_batch_async(["printer jam", "forgot password"]))
+
+        assert [r.category.name for r in results] == ["printer_issue", "password_reset"]
+
+    def test_classify_batch_validation(self, monkeypatch):
+        """Test that invalid batches are rejected before any request is sent"""
+        classifier = LLMClassifier(provider="local")
+
+        with pytest.raises(ValueError):
+            classifier.classify_batch([])
+        with pytest.raises(ValueError):
+            classifier.classify_batch(["ok", "  "])
+        with pytest.raises(ValueError):
+            classifier.classify_batch(["ok"], concurrency=0)
+
+        monkeypatch.setenv("OPENAI_MAX_CONCURRENCY", "3")
+        assert classifier._prepare_batch(["a", "b", "c", "d"], None) == 3
+
+    def test_batch_api_roundtrip(self, monkeypatch):
+        """Test Batch API submission and result parsing with a fake client"""
+        from types import SimpleNamespace
+        import json
+
+        uploaded = {}
+
+        class FakeFiles:
+            extra_lines = []
+
+            def create(self, file, purpose):
+                uploaded["lines"] = file[1].decode("utf-8").splitlines()
+                return SimpleNamespace(id="file-1")
+
+            def content(self, file_id):
+                answer = json.dumps({"category": "printer_issue", "confidence": 0.7})
+                record = {"custom_id": "1", "response": {"body": {"choices": [{"message": {"content": answer}}]}}}
+                return SimpleNamespace(text="\n".join(self.extra_lines + [json.dumps(record)]))
+
+        class FakeBatches:
+            status = "in_progress"
+
+            def create(self, input_file_id, endpoint, completion_window):
+                return SimpleNamespace(id="batch-1")
+
+            def retrieve(self, batch_id):
+                return SimpleNamespace(status=self.status, output_file_id="file-2",
+                                       request_counts=SimpleNamespace(total=2))
+
+        client = SimpleNamespace(files=FakeFiles(), batches=FakeBatches())
+        classifier = LLMClassifier(api_key="test-key", provider="openai")
+        monkeypatch.setattr(classifier, "_openai_client", lambda: client)
+
+        assert classifier.submit_batch(["forgot password", "printer jam"]) == "batch-1"
+        assert len(uploaded["lines"]) == 2
+        assert json.loads(uploaded["lines"][1])["custom_id"] == "1"
+
+        assert classifier.poll_batch("batch-1") is None
+
+        client.batches.status = "completed"
+        results = classifier.poll_batch("batch-1")
+        assert [r.category.name for r in results] == ["other", "printer_issue"]
+        assert results[1].confidence == 0.7
+
+        # Malformed lines only affect their own ticket, not the whole batch
+        client.files.extra_lines = [
+            '{"custom_id": "0", "response": {"body": {"choi',
+            json.dumps({"response": {}}),
+            json.dumps({"custom_id": "0", "response": {"body": {}}}),
+        ]
+        results = classifier.poll_batch("batch-1")
+        assert [r.category.name for r in results] == ["other", "printer_issue"]
+        assert results[0].confidence == 0.0
+        assert results[1].confidence == 0.7
+
+    def test_response_cache(self, monkeypatch):
+        """Test that identical tickets are answered from the cache"""
+        calls = []
+
+        def counting_llm(ticket_text):
+            calls.append(ticket_text)
+            return fake_llm(ticket_text)
+
+        classifier = LLMClassifier(provider="local")
+        monkeypatch.setattr(classifier, "_call_llm", counting_llm)
+
+        first = classifier.classify("forgot password")
+        second = classifier.classify("forgot password")
+
+        assert calls == ["forgot password"]
+        assert second.category.name == first.category.name
+        assert second is not first
+        assert classifier.cache_info().hits == 1
+
+        # Case and whitespace differences share the cached answer
+        classifier.classify("  Forgot\n  PASSWORD ")
+        assert calls == ["forgot password"]
+
+        classifier.model = "other-model"
+        classifier.classify("forgot password")
+        assert len(calls) == 2
+
+    def test_response_cache_expiry(self, monkeypatch):
+        """Test that expired answers and errors are not served from the cache"""
+        calls = []
+
+        def failing_llm(ticket_text):
+            calls.append(ticket_text)
+            raise RuntimeError("boom")
+
+        classifier = LLMClassifier(provider="local", cache_ttl=0.01)
+        monkeypatch.setattr(classifier, "_call_llm", failing_llm)
+
+        assert classifier.classify("printer jam").category.name == "other"
+        assert classifier.classify("printer jam").category.name == "other"
+        assert len(calls) == 2
+
+        monkeypatch.setattr(classifier, "_call_llm", fake_llm)
+        classifier.classify("printer jam")
+        monkeypatch.setattr("ticket_classifier.llm_classifier.time.monotonic", lambda: float("inf"))
+        monkeypatch.setattr(classifier, "_call_llm", failing_llm)
+        assert classifier.classify("printer jam").category.name == "other"
+        assert len(calls) == 3
+
+    def test_classify_batch_groups_by_length(self, monkeypatch):
+        """Test that batches are dispatched by length bin but returned in order"""
+        from ticket_classifier.llm_classifier import _order_by_length_bin
+
+        tickets = ["printer " * 200, "forgot password", "printer " * 40, "password"]
+        assert _order_by_length_bin(tickets) == [1, 3, 2, 0]
+
+        seen = []
+
+        def recording_llm(ticket_text):
+            seen.append(ticket_text)
+            return fake_llm(ticket_text)
+
+        classifier = LLMClassifier(provider="local", cache_size=0)
+        monkeypatch.setattr(classifier, "_call_llm", recording_llm)
+
+        results = classifier.classify_batch(tickets, concurrency=1)
+
+        assert seen == [tickets[1], tickets[3], tickets[2], tickets[0]]
+        assert [r.category.name for r in results] == ["printer_issue", "password_reset",
+                                                       "printer_issue", "password_reset"]
+
+    def test_classify_batch_multi_ticket_prompts(self, monkeypatch):
+        """Test that batch_size groups tickets into one request each"""
+        import re
+
+        prompts = []
+
+        def fake_send(prompt, max_tokens=150):
+            prompts.append((prompt, max_tokens))
+            single = re.search(r'^Ticket: "(.*)"$', prompt, re.MULTILINE)
+            if single:
+                return fake_llm(single.group(1))
+            results = []
+            for idx, ticket in re.findall(r'^\[(\d+)\] "(.*)"$', prompt, re.MULTILINE):
+                if "unanswered" not in ticket:
+                    results.append(dict(fake_llm(ticket), idx=int(idx)))
+            return {"results": results}
+
+        classifier = LLMClassifier(provider="local")
+        monkeypatch.setattr(classifier, "_send_prompt", fake_send)
+
+        tickets = ["forgot password", "printer jam", "unanswered ticket", "password again", "printer down"]
+        results = classifier.classify_batch(tickets, concurrency=1, batch_size=2)
+
+        assert len(prompts) == 3
+        assert prompts[0][1] == 300
+        assert [r.category.name for r in results] == ["password_reset", "printer_issue", "other",
+                                                       "password_reset", "printer_issue"]
+        assert results[2].confidence == 0.0
+
+        # Answered tickets are cached; only the unanswered one is asked again
+        prompts.clear()
+        classifier.classify_batch(tickets, concurrency=1, batch_size=5)
+        assert len(prompts) == 1
+        assert prompts[0][1] == 150
+        assert "[0] \"unanswered ticket\"" in prompts[0][0]
+
+        with pytest.raises(ValueError):
+            classifier.classify_batch(tickets, batch_size=0)
+
+    def test_aclassify_batch_retries_rate_limits(self, monkeypatch):
+        """Test native async batches and retry with backoff on HTTP 429"""
+        from ticket_classifier import llm_classifier
+
+        class RateLimited(Exception):
+            status_code = 429
+
+        attempts = {}
+        in_flight = []
+        delays = []
+        clients = []
+        real_sleep = asyncio.sleep
+
+        class FakeClient:
+            closed = False
+
+            async def close(self):
+                self.closed = True
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc_info):
+                await self.close()
+
+        def fake_async_client():
+            clients.append(FakeClient())
+            return clients[-1]
+
+        async def fake_acall(prompt, max_tokens, client):
+            assert client is clients[-1] and not client.closed
+            ticket = prompt.split('Ticket: "', 1)[1].split('"', 1)[0]
+            attempts[ticket] = attempts.get(ticket, 0) + 1
+            in_flight.append(1)
+            try:
+                assert len(in_flight) <= 2
+                await real_sleep(0)
+                if ticket == "printer jam" and attempts[ticket] < 3:
+                    raise RuntimeError("OpenAI API call failed") from RateLimited()
+                if ticket == "broken":
+                    raise RuntimeError("OpenAI API call failed") from ValueError("bad request")
+                return fake_llm(ticket)
+            finally:
+                in_flight.pop()
+
+        async def fake_sleep(delay):
+            delays.append(delay)
+
+        classifier = LLMClassifier(provider="openai", api_key="test")
+        monkeypatch.setattr(classifier, "_acall_openai", fake_acall)
+        monkeypatch.setattr(classifier, "_async_client", fake_async_client)
+        monkeypatch.setattr(llm_classifier.asyncio, "sleep", fake_sleep)
+
+        tickets = ["printer jam", "forgot password", "broken"]
+        results = asyncio.run(classifier.aclassify_batch(tickets, concurrency=2))
+
+        assert [r.category.name for r in results] == ["printer_issue", "password_reset", "other"]
+        assert attempts == {"printer jam": 3, "forgot password": 1, "broken": 1}
+        assert delays == [1.0, 2.0]
+
+        # One client served the whole batch and was closed afterwards
+        assert len(clients) == 1 and clients[0].closed
+
+        # Successful answers are cached
+        result = asyncio.run(classifier.aclassify("forgot password"))
+        assert result.category.name == "password_reset"
+        assert attempts["forgot password"] == 1
+
+        # A single uncached ticket opens and closes its own client
+        result = asyncio.run(classifier.aclassify("printer on fire"))
+        assert result.category.name == "printer_issue"
+        assert len(clients) == 2 and clients[1].closed
+
+    def test_shared_client_created_once(self):
+        """Test that API clients are created on first use and then reused"""
+        from concurrent.futures import ThreadPoolExecutor
+
+        created = []
+
+        def factory():
+            created.append(object())
+            return created[-1]
+
+        classifier = LLMClassifier(provider="local")
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            clients = list(pool.map(lambda _: classifier._shared_client("local", factory), range(32)))
+
+        assert len(created) == 1
+        assert all(client is created[0] for client in clients)
+        assert classifier._shared_client("other", factory) is created[1]
+
+    def test_extract_json(self):
+        """Test JSON extraction from fenced or chatty model replies"""
+        from ticket_classifier.llm_classifier import _extract_json
+
+        body = '{"category": "vpn", "confidence": 0.9, "nested": {"a": 1}}'
+        assert _extract_json(body) == body
+        assert _extract_json(f"```json\n{body}\n```") == body
+        assert _extract_json(f"```\n{body}\n```") == body
+        assert _extract_json(f"Here you go:\n```json\n{body}\n```\nDone.") == body
+        assert _extract_json(f"Sure! {body} Hope that helps.") == body
+        assert _extract_json(f"```json\n{body}") == body
+        assert _extract_json("no json here") == "no json here"
+
+    def test_custom_category_names(self, monkeypatch):
+        """Test that answers resolve against the classifier's own categories"""
+        from ticket_classifier import TicketCategory
+
+        vpn = TicketCategory(name="vpn", description="VPN problems", keywords=["vpn"], patterns=[])
+        classifier = LLMClassifier(provider="local", categories=[vpn])
+
+        answers = {"vpn down": "vpn", "printer jam": "printer_issue", "weird": "no_such_category"}
+        monkeypatch.setattr(classifier, "_call_llm",
+                            lambda text: {"category": answers[text], "confidence": 0.9})
+
+        assert classifier.classify("vpn down").category is vpn
+        assert classifier.classify("printer jam").category.name == "other"
+        assert classifier.classify("weird").category.name == "other"
+
+    def test_http_pool_sized_for_concurrency(self, monkeypatch):
+        """Test that the local provider's connection pool grows with batch concurrency"""
+        import sys
+        import types
+
+        class FakeSession:
+            def __init__(self):
+                self.adapters = {}
+
+            def mount(self, prefix, adapter):
+                self.adapters[prefix] = adapter
+
+        class FakeAdapter:
+            def __init__(self, pool_connections, pool_maxsize):
+                self.pool_maxsize = pool_maxsize
+
+        requests_module = types.ModuleType("requests")
+        requests_module.Session = FakeSession
+        adapters_module = types.ModuleType("requests.adapters")
+        adapters_module.HTTPAdapter = FakeAdapter
+        monkeypatch.setitem(sys.modules, "requests", requests_module)
+        monkeypatch.setitem(sys.modules, "requests.adapters", adapters_module)
+
+        classifier = LLMClassifier(provider="local")
+        session = classifier._http_session()
+        assert session.adapters["http://"].pool_maxsize == 16
+
+        classifier._prepare_batch(["ticket"] * 100, 40)
+        assert classifier._http_session() is session
+        assert session.adapters["http://"].pool_maxsize == 40
+        assert session.adapters["https://"].pool_maxsize == 40
+
+        # Smaller batches keep the larger pool
+        classifier._prepare_batch(["ticket"] * 100, 4)
+        assert classifier._http_session().adapters["http://"].pool_maxsize == 40
+
+    def test_classify_batch_async_cancel_keeps_loop_free(self, monkeypatch):
+        """Test that cancelling a batch does not block the loop on requests in flight"""
+        import threading
+        import time
+
+        release = threading.Event()
+        calls = []
+
+        def blocking_llm(ticket_text):
+            calls.append(ticket_text)
+            release.wait(5)
+            return fake_llm(ticket_text)
+
+        classifier = LLMClassifier(provider="local")
+        monkeypatch.setattr(classifier, "_call_llm", blocking_llm)
+
+        async def cancel_and_tick():
+            task = asyncio.ensure_future(
+                classifier.classify_batch_async([f"printer {i}" for i in range(6)], concurrency=2))
+            while len(calls) < 2:
+                await asyncio.sleep(0.01)
+
+            start = time.monotonic()
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            elapsed = time.monotonic() - start
+
+            ticks = 0
+            while time.monotonic() - start < 0.3:
+                await asyncio.sleep(0.01)
+                ticks += 1
+            return elapsed, ticks
+
+        try:
+            elapsed, ticks = asyncio.run(cancel_and_tick())
+        finally:
+            release.set()
+
+        assert elapsed < 1.0
+        assert ticks >= 5
+        # Groups that had not started were cancelled, not sent
+        assert len(calls) == 2
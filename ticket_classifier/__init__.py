@@ -6,12 +6,14 @@ A lightweight Python library for classifying support tickets using pattern match
 __version__ = "0.1.1"
 __author__ = "Turtles AI Lab"
 
-from .classifier import TicketClassifier
+from .classifier import TicketClassifier, ClassificationResult, dump_results_jsonl
 from .categories import TicketCategory, DEFAULT_CATEGORIES
 from .llm_classifier import LLMClassifier
 
 __all__ = [
     "TicketClassifier",
+    "ClassificationResult",
+    "dump_results_jsonl",
     "TicketCategory",
     "DEFAULT_CATEGORIES",
     "LLMClassifier"
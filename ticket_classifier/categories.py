@@ -2,23 +2,217 @@
 Ticket categories and their pattern definitions
 """
 
-from dataclasses import dataclass
-from typing import List, Optional
+import re
+import sys
+import logging
+from dataclasses import dataclass, field
+from typing import List, Optional, Pattern, Sequence, Tuple
 
+try:
+    import ahocorasick
+except ImportError:
+    # Optional dependency; keyword matching falls back to substring checks
+    ahocorasick = None
 
-@dataclass
+try:
+    import re2
+except ImportError:
+    # Optional dependency; only used with TicketClassifier(regex_engine="re2")
+    re2 = None
+
+# dataclass(slots=True) requires Python 3.10+; older versions keep __dict__
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+# Any of these makes a pattern more than a plain literal
+_REGEX_METACHARS = frozenset("\\.^$*+?{}[]|()")
+_REGEX_METACHARS_RE = re.compile(r"[\\.^$*+?{}\[\]|()]")
+
+# Escapes that can spell an uppercase letter (\x41, \101, \N{...}) and
+# character-class ranges (which can span A-Z without naming it); patterns
+# using them keep re.IGNORECASE even on lowercase text
+_CASE_SENSITIVE_SYNTAX_RE = re.compile(r"\\[xuUN0-7]|\[[^\]]*-")
+
+# Syntax that changes meaning once a pattern is embedded in an alternation:
+# numbered backreferences and conditionals (\1, (?(1)...)) refer to shifted
+# group numbers, and global inline flags ((?x), (?i)) apply to every
+# alternative. Patterns using them are never unioned
+_UNION_UNSAFE_RE = re.compile(r"\\[1-9]|\(\?\(\d|\(\?[aiLmsux]+\)")
+
+
+def _compile_union(alternatives: List[str], flags: int = re.IGNORECASE) -> Optional[Pattern]:
+    """
+    Compile alternatives into one regex (case-insensitive by default)
+
+    Returns None when there is nothing to combine or when the alternatives
+    cannot be safely combined (backreferences, numbered conditionals, global
+    inline flags, conflicting group names).
+    """
+    if not alternatives:
+        return None
+    if any(_UNION_UNSAFE_RE.search(alt) for alt in alternatives):
+        return None
+    try:
+        return re.compile("|".join(alternatives), flags)
+    except re.error:
+        return None
+
+
+def _literal_prefix(pattern: str) -> str:
+    """Leading characters of a pattern that match only themselves"""
+    end = 0
+    while end < len(pattern) and pattern[end] not in _REGEX_METACHARS:
+        end += 1
+    # A quantifier applies to the character before it, which is not literal then
+    if end < len(pattern) and pattern[end] in "*+?{" and end > 0:
+        end -= 1
+    return pattern[:end]
+
+
+def _merge_common_prefixes(patterns: List[str]) -> str:
+    """
+    Combine patterns into one alternation, sharing common literal prefixes
+
+    ``can'?t.*print`` and ``can'?t.*connect`` become
+    ``can(?:(?:'?t.*print)|(?:'?t.*connect))`` so the engine walks the shared
+    prefix once. Alternatives are reordered and patterns that are fully
+    literal absorb the rest of their branch, so the result only preserves
+    *whether* and *where* (leftmost start) a match occurs, which is all a gate
+    needs. Patterns containing ``|`` are kept whole.
+    """
+    # Trie node: (remainders ending at this node, {char: child node})
+    root = ([], {})
+    for pattern in patterns:
+        prefix = "" if "|" in pattern else _literal_prefix(pattern)
+        node = root
+        for char in prefix:
+            node = node[1].setdefault(char, ([], {}))
+        node[0].append(pattern[len(prefix):])
+
+    def emit(node) -> str:
+        remainders, children = node
+        if "" in remainders:
+            # The prefix alone already matches; longer branches add nothing
+            return ""
+        alternatives = [f"(?:{remainder})" for remainder in remainders]
+        for char, child in children.items():
+            chain = char
+            while not child[0] and len(child[1]) == 1:
+                (char, child), = child[1].items()
+                chain += char
+            alternatives.append(chain + emit(child))
+        if len(alternatives) == 1:
+            return alternatives[0]
+        return "(?:" + "|".join(alternatives) + ")"
+
+    return emit(root)
+
+
+def _compile_ascii(pattern: str) -> Optional[Pattern]:
+    """
+    Compile an ASCII pattern for matching lowercase, ASCII-only text
+
+    re.ASCII skips Unicode case folding and character-class lookups, which
+    gives identical results when both pattern and text are ASCII. Since the
+    text is lowercase, patterns without uppercase letters (and without
+    escapes or ranges that could denote them) also drop re.IGNORECASE.
+
+    Returns None for non-ASCII patterns or flag conflicts such as ``(?u)``.
+    """
+    if not pattern.isascii():
+        return None
+    flags = re.IGNORECASE | re.ASCII
+    if pattern == pattern.lower() and not _CASE_SENSITIVE_SYNTAX_RE.search(pattern):
+        flags = re.ASCII
+    try:
+        return re.compile(pattern, flags)
+    except re.error:
+        return None
+
+
+def compile_re2(pattern: str):
+    """
+    Compile a pattern case-insensitively with google-re2
+
+    RE2 matches in linear time, so patterns such as ``\\w+.*is.*broken`` cannot
+    backtrack catastrophically on long tickets. Its syntax and semantics
+    differ slightly from ``re``: no lookarounds or backreferences, ``\\w``,
+    ``\\d`` and ``\\b`` are ASCII-only, and ``$`` only matches at the very end.
+
+    Returns:
+        Compiled RE2 pattern, or None if google-re2 is not installed or RE2
+        does not support the pattern
+    """
+    if re2 is None:
+        return None
+    options = re2.Options()
+    options.case_sensitive = False
+    options.log_errors = False
+    try:
+        return re2.compile(pattern, options)
+    except re2.error:
+        return None
+
+
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class TicketCategory:
-    """Represents a support ticket category with matching patterns"""
+    """
+    Represents a support ticket category with matching patterns
+
+    Categories are immutable: keywords and patterns are stored as tuples
+    (lists are accepted and converted), so precompiled state can never go
+    stale and categories are hashable.
+
+    Each keyword hit normally counts as 1; ``keyword_weights`` (one weight
+    per keyword, defaulting to 1.0) lets some keywords count more or less.
+    """
 
     name: str
     description: str
-    keywords: List[str]
-    patterns: List[str]
+    keywords: Sequence[str]
+    patterns: Sequence[str]
     priority: str = "medium"
     auto_resolvable: bool = False
+    keyword_weights: Optional[Sequence[float]] = None
+
+    # Derived at construction time, not part of the public constructor
+    compiled_patterns: Tuple[Pattern, ...] = field(init=False, repr=False, compare=False)
+    combined_pattern: Optional[Pattern] = field(init=False, repr=False, compare=False)
+    keywords_lower: Tuple[str, ...] = field(init=False, repr=False, compare=False)
+    pattern_literals: Tuple[Optional[str], ...] = field(init=False, repr=False, compare=False)
+    # Variants used when the ticket text is lowercase ASCII (see _compile_ascii)
+    ascii_patterns: Tuple[Pattern, ...] = field(init=False, repr=False, compare=False)
+    ascii_combined_pattern: Optional[Pattern] = field(init=False, repr=False, compare=False)
 
     def __post_init__(self):
-        """Validate TicketCategory fields after initialization"""
+        """Validate and prepare TicketCategory fields after initialization"""
+        # Always validate; TicketCategory.unsafe() is the opt-out for trusted input
+        self._validate()
+
+        self._prepare()
+
+    @classmethod
+    def unsafe(cls, name: str, description: str, keywords: Sequence[str], patterns: Sequence[str],
+               priority: str = "medium", auto_resolvable: bool = False,
+               keyword_weights: Optional[Sequence[float]] = None) -> "TicketCategory":
+        """
+        Create a category without validating its fields
+
+        For trusted input only (e.g. categories rebuilt from data this library
+        produced); invalid values fail later instead of raising here.
+        """
+        category = cls.__new__(cls)
+        object.__setattr__(category, "name", name)
+        object.__setattr__(category, "description", description)
+        object.__setattr__(category, "keywords", keywords)
+        object.__setattr__(category, "patterns", patterns)
+        object.__setattr__(category, "priority", priority)
+        object.__setattr__(category, "auto_resolvable", auto_resolvable)
+        object.__setattr__(category, "keyword_weights", keyword_weights)
+        category._prepare()
+        return category
+
+    def _validate(self):
+        """Check field types and values"""
         # Validate name
         if not isinstance(self.name, str):
             raise TypeError(f"name must be str, not {type(self.name).__name__}")
@@ -32,15 +226,15 @@ class TicketCategory:
             raise ValueError("description cannot be empty")
 
         # Validate keywords
-        if not isinstance(self.keywords, list):
-            raise TypeError(f"keywords must be list, not {type(self.keywords).__name__}")
+        if not isinstance(self.keywords, (list, tuple)):
+            raise TypeError(f"keywords must be list or tuple, not {type(self.keywords).__name__}")
         for i, keyword in enumerate(self.keywords):
             if not isinstance(keyword, str):
                 raise TypeError(f"keywords[{i}] must be str, not {type(keyword).__name__}")
 
         # Validate patterns
-        if not isinstance(self.patterns, list):
-            raise TypeError(f"patterns must be list, not {type(self.patterns).__name__}")
+        if not isinstance(self.patterns, (list, tuple)):
+            raise TypeError(f"patterns must be list or tuple, not {type(self.patterns).__name__}")
         for i, pattern in enumerate(self.patterns):
             if not isinstance(pattern, str):
                 raise TypeError(f"patterns[{i}] must be str, not {type(pattern).__name__}")
@@ -56,6 +250,82 @@ class TicketCategory:
         if not isinstance(self.auto_resolvable, bool):
             raise TypeError(f"auto_resolvable must be bool, not {type(self.auto_resolvable).__name__}")
 
+        # Validate keyword_weights
+        if self.keyword_weights is not None:
+            if not isinstance(self.keyword_weights, (list, tuple)):
+                raise TypeError(
+                    f"keyword_weights must be list or tuple, not {type(self.keyword_weights).__name__}"
+                )
+            if len(self.keyword_weights) != len(self.keywords):
+                raise ValueError(
+                    f"keyword_weights must have one weight per keyword, "
+                    f"got {len(self.keyword_weights)} for {len(self.keywords)} keywords"
+                )
+            for i, weight in enumerate(self.keyword_weights):
+                if isinstance(weight, bool) or not isinstance(weight, (int, float)):
+                    raise TypeError(f"keyword_weights[{i}] must be numeric, not {type(weight).__name__}")
+                if weight < 0:
+                    raise ValueError(f"keyword_weights[{i}] cannot be negative, got {weight}")
+
+    def _prepare(self):
+        """Normalize fields and derive matching structures"""
+        # Frozen dataclass: derived and normalized fields go through object.__setattr__
+        # Names and priorities are compared and counted per ticket; interning
+        # makes equal values share one object so comparisons short-circuit
+        object.__setattr__(self, "name", sys.intern(self.name))
+        object.__setattr__(self, "priority", sys.intern(self.priority))
+        object.__setattr__(self, "keywords", tuple(self.keywords))
+        # Pattern strings are what results report in matched_patterns;
+        # interning lets categories built separately from the same
+        # definitions (e.g. loaded from configuration) share them
+        object.__setattr__(self, "patterns", tuple(sys.intern(pattern) for pattern in self.patterns))
+        object.__setattr__(self, "keywords_lower", tuple(keyword.lower() for keyword in self.keywords))
+        if self.keyword_weights is None:
+            keyword_weights = (1.0,) * len(self.keywords)
+        else:
+            keyword_weights = tuple(float(weight) for weight in self.keyword_weights)
+        object.__setattr__(self, "keyword_weights", keyword_weights)
+        self._compile_patterns()
+
+    def _compile_patterns(self):
+        """Precompile patterns once so classification never re-parses them"""
+        compiled_patterns = []
+        for pattern in self.patterns:
+            try:
+                compiled_patterns.append(re.compile(pattern, re.IGNORECASE))
+            except re.error as e:
+                # Skip invalid regex patterns with warning
+                logging.warning(f"Invalid regex pattern '{pattern}' in category '{self.name}': {e}")
+        object.__setattr__(self, "compiled_patterns", tuple(compiled_patterns))
+
+        # Lowercase form of ASCII patterns without metacharacters, matchable
+        # with a substring check instead of the regex engine
+        object.__setattr__(self, "pattern_literals", tuple(
+            cp.pattern.lower() if cp.pattern.isascii() and not _REGEX_METACHARS_RE.search(cp.pattern) else None
+            for cp in compiled_patterns
+        ))
+
+        # Single alternation used to reject non-matching text in one scan and
+        # to find where the earliest match starts. Shared literal prefixes are
+        # factored out; the plain union is the fallback
+        alternatives = [f"(?:{cp.pattern})" for cp in compiled_patterns]
+        merged = [_merge_common_prefixes([cp.pattern for cp in compiled_patterns])] if compiled_patterns else []
+        object.__setattr__(self, "combined_pattern", _compile_union(merged) or _compile_union(alternatives))
+
+        ascii_patterns = [_compile_ascii(cp.pattern) for cp in compiled_patterns]
+        object.__setattr__(self, "ascii_patterns", tuple(
+            ascii_cp or cp for ascii_cp, cp in zip(ascii_patterns, compiled_patterns)
+        ))
+        # The ASCII union is only valid if every pattern has an ASCII form,
+        # and may only skip case folding if every pattern does
+        ascii_combined = None
+        if all(ascii_patterns):
+            flags = re.ASCII
+            if any(ascii_cp.flags & re.IGNORECASE for ascii_cp in ascii_patterns):
+                flags |= re.IGNORECASE
+            ascii_combined = _compile_union(merged, flags) or _compile_union(alternatives, flags)
+        object.__setattr__(self, "ascii_combined_pattern", ascii_combined)
+
     def __repr__(self):
         return f"TicketCategory(name='{self.name}', priority='{self.priority}')"
 
@@ -248,6 +518,78 @@ DEFAULT_CATEGORIES = [
 ]
 
 
+def build_global_union(categories: List[TicketCategory], ascii: bool = False) -> Optional[Pattern]:
+    """
+    Build one regex matching any pattern of any category
+
+    Each category is wrapped in a named group ``c<index>`` (category names are
+    not guaranteed to be valid group names), so ``match.lastgroup`` identifies
+    the category of the first hit.
+
+    Args:
+        categories: Categories to combine
+        ascii: Build the variant for lowercase ASCII-only text from each category's
+            ascii_combined_pattern
+
+    Returns:
+        Compiled pattern, or None if the categories cannot be combined
+    """
+    alternatives = []
+    # The ASCII variant skips case folding if every category's ASCII union does
+    case_sensitive = True
+    for i, category in enumerate(categories):
+        combined = category.ascii_combined_pattern if ascii else category.combined_pattern
+        if combined is None:
+            if category.compiled_patterns:
+                # Leaving this category out would hide its matches
+                return None
+            continue
+        alternatives.append(f"(?P<c{i}>{combined.pattern})")
+        if ascii and combined.flags & re.IGNORECASE:
+            case_sensitive = False
+    flags = re.IGNORECASE
+    if ascii:
+        flags = re.ASCII if case_sensitive else re.IGNORECASE | re.ASCII
+    return _compile_union(alternatives, flags)
+
+
+def build_keyword_automaton(categories: List[TicketCategory]):
+    """
+    Build an Aho-Corasick automaton over the keywords of all categories
+
+    Each lowercase keyword maps to ``(keyword, owners)`` where ``owners`` is
+    a tuple of ``(category_index, weight)`` for every category containing it
+    (repeated if a category lists the keyword twice), so one pass over the
+    text yields all weighted keyword hits.
+
+    Args:
+        categories: Categories whose keywords should be indexed
+
+    Returns:
+        ``ahocorasick.Automaton``, or None if pyahocorasick is not installed,
+        there are no keywords, or a keyword is empty
+    """
+    if ahocorasick is None:
+        return None
+
+    owners = {}
+    for i, category in enumerate(categories):
+        for keyword, weight in zip(category.keywords_lower, category.keyword_weights):
+            if not keyword:
+                # An empty keyword matches every text; leave that to the fallback
+                return None
+            owners.setdefault(keyword, []).append((i, weight))
+
+    if not owners:
+        return None
+
+    automaton = ahocorasick.Automaton()
+    for keyword, keyword_owners in owners.items():
+        automaton.add_word(keyword, (keyword, tuple(keyword_owners)))
+    automaton.make_automaton()
+    return automaton
+
+
 def get_category_by_name(name: str) -> Optional[TicketCategory]:
     """Get a category by its name"""
     for category in DEFAULT_CATEGORIES:
@@ -3,15 +3,169 @@ Core ticket classification engine using pattern matching
 """
 
 import re
-import logging
-from typing import List, Dict, Tuple, Optional
-from .categories import TicketCategory, DEFAULT_CATEGORIES
+import json
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from hashlib import blake2b
+from collections import OrderedDict, namedtuple
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+from .categories import (
+    DEFAULT_CATEGORIES,
+    TicketCategory,
+    build_global_union,
+    build_keyword_automaton,
+    compile_re2,
+    re2,
+)
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
+# Tickets are truncated to this many characters before matching
+MAX_TEXT_LENGTH = 5000
+
+# With early exit enabled, scoring stops at the first category reaching this score
+EARLY_EXIT_SCORE = 1.0
+
+# With early exit enabled, evaluation order is re-ranked by win count this often
+REORDER_INTERVAL = 256
+
+# classify_batch(workers=...) only starts worker processes for batches at least this large
+MIN_PARALLEL_BATCH = 512
+
+# Longer ticket texts are cached under a 16-byte digest instead of the text itself
+CACHE_KEY_DIGEST_LENGTH = 256
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+REGEX_ENGINES = ("re", "re2")
+
+# Number of compiled category indexes kept for reuse by new classifiers
+_INDEX_CACHE_SIZE = 32
+
+# Runs of whitespace collapsed to one space with normalize_whitespace=True
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Saturation points of _combine_scores: two pattern matches already give the
+# maximum score of 1.0, and keyword_score stops growing at five keywords
+_PATTERN_SATURATION = 2
+_KEYWORD_SATURATION = 5
+
+
+def _combine_scores(pattern_matches: int, keyword_matches: int) -> float:
+    """
+    Turn per-category match counts into a confidence score
+
+    Kept free of regex and object access so the numeric step can be run
+    separately from (and after) text scanning.
+
+    Args:
+        pattern_matches: Number of regex patterns that matched
+        keyword_matches: Weighted number of keywords found in the text
+
+    Returns:
+        Score between 0.0 and 1.0
+    """
+    # Calculate weighted score
+    # Each pattern match is worth 0.5, each keyword match is worth 0.1
+    # This rewards matches without penalizing categories with many patterns.
+    # Clamps are inline comparisons rather than min() calls; every term is
+    # non-negative, so clamping once at the end gives the same result as
+    # clamping after each step, and pattern_score needs no clamp of its own
+    # (two or more pattern matches saturate the final score anyway)
+    pattern_score = pattern_matches * 0.5
+    keyword_score = keyword_matches * 0.1
+    if keyword_score > 0.5:
+        keyword_score = 0.5
+
+    score = pattern_score + keyword_score
+
+    # Boost score if multiple matches found
+    if pattern_matches >= 2:
+        score += 0.1
+    if keyword_matches >= 3:
+        score += 0.05
+
+    return score if score < 1.0 else 1.0
+
+
+def _prepare_text(ticket_text: str, normalize_whitespace: bool = False) -> str:
+    """Truncate ticket text to MAX_TEXT_LENGTH and lowercase it for matching"""
+    # Limit text length for performance (avoid catastrophic backtracking)
+    if len(ticket_text) > MAX_TEXT_LENGTH:
+        ticket_text = ticket_text[:MAX_TEXT_LENGTH]
+    if normalize_whitespace:
+        return _WHITESPACE_RE.sub(" ", ticket_text.lower())
+    return ticket_text.lower()
+
+
+def _cache_key(text_lower: str):
+    """Key for the result cache: the text itself, or a digest of long texts"""
+    if len(text_lower) <= CACHE_KEY_DIGEST_LENGTH:
+        return text_lower
+    return blake2b(text_lower.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+def _build_match_plan(category: TicketCategory, use_re2: bool = False) -> tuple:
+    """
+    Resolve everything scoring needs from a category once, up front
+
+    With ``use_re2``, every pattern (and the category's gate) that RE2 can
+    compile is matched with RE2; the rest keep their ``re`` form.
+
+    Returns ``(is_other, keywords_lower, keyword_weights, unicode_plan, ascii_plan)``
+    where ``keyword_weights`` is None when every keyword weighs 1.0, each plan
+    is ``(gate, checks)`` and every check is ``(pattern, compiled, literal)``.
+    Literals are only used in the ASCII plan, where a substring check is
+    equivalent to the IGNORECASE regex.
+    """
+    unicode_checks = tuple((cp.pattern, cp, None) for cp in category.compiled_patterns)
+    ascii_checks = tuple(
+        (cp.pattern, cp, literal)
+        for cp, literal in zip(category.ascii_patterns, category.pattern_literals)
+    )
+    unicode_gate = category.combined_pattern
+    ascii_gate = category.ascii_combined_pattern or category.combined_pattern
+    if use_re2:
+        unicode_checks = tuple(
+            (pattern, compile_re2(pattern) or compiled, None) for pattern, compiled, _ in unicode_checks
+        )
+        ascii_checks = tuple(
+            (pattern, compiled if literal is not None else compile_re2(pattern) or compiled, literal)
+            for pattern, compiled, literal in ascii_checks
+        )
+        if unicode_gate is not None:
+            unicode_gate = ascii_gate = compile_re2(unicode_gate.pattern) or unicode_gate
+    weights = category.keyword_weights
+    return (
+        category.name == "other",
+        category.keywords_lower,
+        None if all(weight == 1.0 for weight in weights) else weights,
+        (unicode_gate, unicode_checks),
+        (ascii_gate, ascii_checks),
+    )
+
+
+@dataclass(eq=False)
 class ClassificationResult:
     """Result of ticket classification"""
 
-    def __init__(self, category: TicketCategory, confidence: float, matched_patterns: List[str]):
+    # Declared by hand (rather than dataclass(slots=True)) so results are
+    # slotted on every supported Python version, not only 3.10+
+    __slots__ = ("category", "confidence", "matched_patterns")
+
+    category: TicketCategory
+    confidence: float
+    matched_patterns: List[str]
+
+    def __post_init__(self):
+        category = self.category
+        confidence = self.confidence
+        matched_patterns = self.matched_patterns
+
         # Validate category
         if category is None:
             raise ValueError("category cannot be None")
@@ -32,9 +186,22 @@ class ClassificationResult:
         if not isinstance(matched_patterns, list):
             raise TypeError(f"matched_patterns must be list, not {type(matched_patterns).__name__}")
 
-        self.category = category
         self.confidence = float(confidence)
-        self.matched_patterns = matched_patterns
+
+    @classmethod
+    def _create_unchecked(cls, category: TicketCategory, confidence: float,
+                          matched_patterns: List[str]) -> "ClassificationResult":
+        """
+        Build a result without validation, for the classifiers' own results
+
+        Callers must pass a TicketCategory, a float between 0.0 and 1.0 and a
+        list, exactly as the checks in __post_init__ would leave them.
+        """
+        result = object.__new__(cls)
+        result.category = category
+        result.confidence = confidence
+        result.matched_patterns = matched_patterns
+        return result
 
     def __repr__(self):
         return f"ClassificationResult(category='{self.category.name}', confidence={self.confidence:.2f})"
@@ -51,10 +218,44 @@ class ClassificationResult:
         }
 
 
+def dump_results_jsonl(results: Iterable[ClassificationResult], path: str) -> int:
+    """
+    Write classification results to a JSON Lines file
+
+    Each result is written as its ``to_dict()`` form on its own line. Uses
+    ``orjson`` when it is installed and the standard ``json`` module otherwise.
+
+    Args:
+        results: Classification results to write
+        path: Destination file path (overwritten if it exists)
+
+    Returns:
+        Number of results written
+    """
+    count = 0
+    if orjson is not None:
+        with open(path, "wb") as f:
+            for result in results:
+                f.write(orjson.dumps(result.to_dict()))
+                f.write(b"\n")
+                count += 1
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            for result in results:
+                f.write(json.dumps(result.to_dict()))
+                f.write("\n")
+                count += 1
+    return count
+
+
 class TicketClassifier:
     """
     Lightweight ticket classifier using pattern matching and keyword analysis.
 
+    classify() and classify_batch() are safe to call from several threads
+    sharing one instance; add_category()/remove_category() are not meant to
+    run concurrently with classification.
+
     Example:
         >>> classifier = TicketClassifier()
         >>> result = classifier.classify("I forgot my password and can't log in")
@@ -64,13 +265,43 @@ class TicketClassifier:
         0.95
     """
 
-    def __init__(self, categories: Optional[List[TicketCategory]] = None):
+    # Compiled indexes shared between instances, keyed by (categories, regex_engine)
+    _index_cache = OrderedDict()
+    _index_cache_lock = threading.Lock()
+
+    def __init__(self, categories: Optional[List[TicketCategory]] = None, cache_size: int = 4096,
+                 early_exit: bool = False, regex_engine: str = "re", normalize_whitespace: bool = False):
         """
         Initialize classifier with categories
 
         Args:
             categories: List of TicketCategory objects. If None, uses DEFAULT_CATEGORIES
+            cache_size: Number of recent ticket texts whose results are cached (0 disables caching)
+            early_exit: Score categories most-frequent-winner first and stop at the first one
+                reaching EARLY_EXIT_SCORE. Faster, but ties may resolve to a different category
+            regex_engine: "re" (default) or "re2". "re2" matches patterns with google-re2,
+                which runs in linear time and cannot backtrack catastrophically on long
+                tickets; see compile_re2() for the differences in pattern semantics
+            normalize_whitespace: Collapse runs of whitespace (newlines, tabs, repeated
+                spaces) to a single space before matching, so multi-word keywords match
+                across line breaks. Also lets tickets differing only in spacing share a
+                cache entry
         """
+        if isinstance(cache_size, bool) or not isinstance(cache_size, int):
+            raise TypeError(f"cache_size must be int, not {type(cache_size).__name__}")
+        if cache_size < 0:
+            raise ValueError(f"cache_size must be >= 0, got {cache_size}")
+        if not isinstance(early_exit, bool):
+            raise TypeError(f"early_exit must be bool, not {type(early_exit).__name__}")
+        if not isinstance(regex_engine, str):
+            raise TypeError(f"regex_engine must be str, not {type(regex_engine).__name__}")
+        if regex_engine not in REGEX_ENGINES:
+            raise ValueError(f"regex_engine must be one of {list(REGEX_ENGINES)}, got '{regex_engine}'")
+        if regex_engine == "re2" and re2 is None:
+            raise ImportError("google-re2 package required. Install with: pip install google-re2")
+        if not isinstance(normalize_whitespace, bool):
+            raise TypeError(f"normalize_whitespace must be bool, not {type(normalize_whitespace).__name__}")
+
         if categories is not None:
             if not isinstance(categories, list):
                 raise TypeError(f"categories must be list, not {type(categories).__name__}")
@@ -78,10 +309,86 @@ class TicketClassifier:
                 if not isinstance(category, TicketCategory):
                     raise TypeError(f"categories[{i}] must be TicketCategory, not {type(category).__name__}")
 
-        self.categories = categories if categories is not None else DEFAULT_CATEGORIES
+        # Copy so add_category/remove_category never leak into the caller's list
+        # (or into DEFAULT_CATEGORIES) and precompiled state stays in sync
+        self.categories = list(categories) if categories is not None else list(DEFAULT_CATEGORIES)
         if not self.categories:
             raise ValueError("categories list cannot be empty")
 
+        self._cache_size = cache_size
+        self._cache = OrderedDict()
+        # classify() may be called from several threads sharing one classifier
+        self._cache_lock = threading.Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
+
+        self.early_exit = early_exit
+        self.regex_engine = regex_engine
+        self.normalize_whitespace = normalize_whitespace
+
+        self._build_index()
+
+    def _build_index(self):
+        """Rebuild matching structures derived from self.categories"""
+        (self._global_pattern, self._ascii_global_pattern, self._keyword_automaton,
+         self._match_plans, self._scorable_indices) = self._shared_index()
+        self._other_category = next((c for c in self.categories if c.name == "other"), None)
+        # Win counts drive the evaluation order used by early exit
+        self._wins = [0] * len(self.categories)
+        self._evaluation_order = list(range(len(self.categories)))
+        self._since_reorder = 0
+        # Cached results refer to the previous category set
+        with self._cache_lock:
+            self._cache.clear()
+
+    def _shared_index(self) -> tuple:
+        """
+        Get the compiled index for the current categories and regex engine
+
+        Indexes are never modified once built, so classifiers created with
+        equal category lists (every TicketClassifier() using the defaults, for
+        example) share one instead of each compiling its own.
+
+        Returns:
+            Tuple of (global_pattern, ascii_global_pattern, keyword_automaton,
+            match_plans, scorable_indices)
+        """
+        try:
+            key = (tuple(self.categories), self.regex_engine)
+            hash(key)
+        except TypeError:
+            # Unhashable category subclass
+            return self._compile_index()
+
+        cache = TicketClassifier._index_cache
+        with TicketClassifier._index_cache_lock:
+            index = cache.get(key)
+            if index is not None:
+                cache.move_to_end(key)
+                return index
+
+        index = self._compile_index()
+        with TicketClassifier._index_cache_lock:
+            index = cache.setdefault(key, index)
+            if len(cache) > _INDEX_CACHE_SIZE:
+                cache.popitem(last=False)
+        return index
+
+    def _compile_index(self) -> tuple:
+        """Compile the matching structures for the current categories (see _shared_index)"""
+        use_re2 = self.regex_engine == "re2"
+        global_pattern = build_global_union(self.categories)
+        if use_re2 and global_pattern is not None:
+            global_pattern = compile_re2(global_pattern.pattern) or global_pattern
+            ascii_global_pattern = global_pattern
+        else:
+            ascii_global_pattern = build_global_union(self.categories, ascii=True) or global_pattern
+        keyword_automaton = build_keyword_automaton(self.categories)
+        match_plans = tuple(_build_match_plan(category, use_re2) for category in self.categories)
+        # "other" always scores 0.0, so only the remaining categories are scored
+        scorable_indices = tuple(i for i, plan in enumerate(match_plans) if not plan[0])
+        return global_pattern, ascii_global_pattern, keyword_automaton, match_plans, scorable_indices
+
     def classify(self, ticket_text: str, threshold: float = 0.25) -> ClassificationResult:
         """
         Classify a ticket based on its text content
@@ -101,38 +408,179 @@ class TicketClassifier:
         if not 0.0 <= threshold <= 1.0:
             raise ValueError(f"threshold must be between 0.0 and 1.0, got {threshold}")
 
-        # Limit text length for performance (avoid catastrophic backtracking)
-        MAX_TEXT_LENGTH = 5000
-        if len(ticket_text) > MAX_TEXT_LENGTH:
-            ticket_text = ticket_text[:MAX_TEXT_LENGTH]
+        return self._classify_text(ticket_text, threshold)
 
-        ticket_text_lower = ticket_text.lower()
-        scores = []
+    def _classify_text(self, ticket_text: str, threshold: float) -> ClassificationResult:
+        """
+        Classify already validated ticket text
 
-        for category in self.categories:
-            score, matched = self._calculate_score(ticket_text_lower, category)
-            scores.append((category, score, matched))
+        Args:
+            ticket_text: The ticket subject/description text
+            threshold: Minimum confidence threshold (0.0 to 1.0)
 
-        # Sort by score descending
-        scores.sort(key=lambda x: x[1], reverse=True)
+        Returns:
+            ClassificationResult with the best matching category
+        """
+        return self._make_result(self._best_match_cached(ticket_text), threshold)
+
+    def _best_match_cached(self, ticket_text: str) -> Tuple[TicketCategory, float, Tuple[str, ...]]:
+        """
+        Find the best match for raw ticket text, going through the result cache
+
+        Args:
+            ticket_text: The ticket subject/description text
+
+        Returns:
+            Tuple of (category, score, matched_patterns)
+        """
+        return self._best_match_prelowered(_prepare_text(ticket_text, self.normalize_whitespace))
+
+    def _best_match_prelowered(self, ticket_text_lower: str) -> Tuple[TicketCategory, float, Tuple[str, ...]]:
+        """
+        Find the best match for text already passed through _prepare_text
 
-        # Get best match
-        best_category, best_score, best_matches = scores[0]
+        Args:
+            ticket_text_lower: Truncated, lowercase ticket text
+
+        Returns:
+            Tuple of (category, score, matched_patterns)
+        """
+        key = _cache_key(ticket_text_lower) if self._cache_size else None
+        best = self._cache_get(key)
+        if best is None:
+            best = self._best_match(ticket_text_lower)
+            self._cache_put(key, best)
+        return best
+
+    def _make_result(self, best: Tuple[TicketCategory, float, Tuple[str, ...]],
+                     threshold: float) -> ClassificationResult:
+        """Apply the threshold to a best match and build a fresh result"""
+        best_category, best_score, best_matches = best
 
         # If score is below threshold and not "other", return "other"
         if best_score < threshold and best_category.name != "other":
-            other_category = next((c for c in self.categories if c.name == "other"), best_category)
-            return ClassificationResult(other_category, best_score, [])
+            return ClassificationResult._create_unchecked(self._other_category or best_category, best_score, [])
+
+        return ClassificationResult._create_unchecked(best_category, best_score, list(best_matches))
+
+    def _best_match(self, ticket_text_lower: str) -> Tuple[TicketCategory, float, Tuple[str, ...]]:
+        """
+        Score every category and return the best one, ignoring the threshold
 
-        return ClassificationResult(best_category, best_score, best_matches)
+        Args:
+            ticket_text_lower: Truncated, lowercase ticket text
 
-    def classify_batch(self, tickets: List[str], threshold: float = 0.25) -> List[ClassificationResult]:
+        Returns:
+            Tuple of (category, score, matched_patterns)
+        """
+        # One scan over the text decides whether any pattern can match at all,
+        # and where the earliest match of any pattern can start
+        is_ascii = ticket_text_lower.isascii()
+        global_pattern = self._ascii_global_pattern if is_ascii else self._global_pattern
+        pattern_start = 0
+        if global_pattern is not None:
+            match = global_pattern.search(ticket_text_lower)
+            pattern_start = match.start() if match is not None else None
+
+        keyword_counts = self._count_keywords(ticket_text_lower)
+
+        if self.early_exit:
+            return self._best_match_early_exit(ticket_text_lower, is_ascii, pattern_start, keyword_counts)
+
+        # Highest score wins and ties go to the earliest category. If nothing
+        # scores above 0.0 the first category wins, as "other" (skipped here)
+        # or any other zero-score category would
+        best_index, best_score, best_matches = 0, 0.0, []
+        for i in self._scorable_indices:
+            keyword_matches = keyword_counts[i] if keyword_counts is not None else None
+            score, matched = self._calculate_score(ticket_text_lower, i, is_ascii, pattern_start, keyword_matches)
+            if score > best_score:
+                best_index, best_score, best_matches = i, score, matched
+
+        return self.categories[best_index], best_score, tuple(best_matches)
+
+    def _best_match_early_exit(self, text: str, is_ascii: bool, pattern_start: Optional[int],
+                               keyword_counts: Optional[List[float]]) -> Tuple[TicketCategory, float, Tuple[str, ...]]:
+        """
+        Score categories in order of past wins, stopping at a saturated score
+
+        Args:
+            text: Truncated, lowercase ticket text
+            is_ascii: Whether text is ASCII-only
+            pattern_start: Offset before which no pattern matches, or None if none can match
+            keyword_counts: Precomputed weighted keyword counts per category, or None
+
+        Returns:
+            Tuple of (category, score, matched_patterns)
+        """
+        best_index = self._evaluation_order[0]
+        best_score = -1.0
+        best_matches = []
+        for i in self._evaluation_order:
+            keyword_matches = keyword_counts[i] if keyword_counts is not None else None
+            score, matched = self._calculate_score(text, i, is_ascii, pattern_start, keyword_matches)
+            if score > best_score:
+                best_index, best_score, best_matches = i, score, matched
+                if score >= EARLY_EXIT_SCORE:
+                    break
+
+        # Unlocked on purpose: a lost update under concurrent use only nudges
+        # the evaluation order, and the order list is swapped atomically
+        self._wins[best_index] += 1
+        self._since_reorder += 1
+        if self._since_reorder >= REORDER_INTERVAL:
+            self._since_reorder = 0
+            wins = self._wins
+            self._evaluation_order = sorted(range(len(self.categories)), key=lambda i: -wins[i])
+
+        return self.categories[best_index], best_score, tuple(best_matches)
+
+    def _cache_get(self, key) -> Optional[Tuple[TicketCategory, float, Tuple[str, ...]]]:
+        """Look up a cached best match, marking it as recently used"""
+        if not self._cache_size:
+            return None
+        with self._cache_lock:
+            best = self._cache.get(key)
+            if best is None:
+                self._cache_misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self._cache_hits += 1
+            return best
+
+    def _cache_put(self, key, best: Tuple[TicketCategory, float, Tuple[str, ...]]):
+        """Store a best match, evicting the least recently used entry if full"""
+        if not self._cache_size:
+            return
+        with self._cache_lock:
+            self._cache[key] = best
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+    def cache_info(self) -> CacheInfo:
+        """Get result cache statistics (hits, misses, maxsize, currsize)"""
+        with self._cache_lock:
+            return CacheInfo(self._cache_hits, self._cache_misses, self._cache_size, len(self._cache))
+
+    def cache_clear(self):
+        """Clear cached results and reset statistics"""
+        with self._cache_lock:
+            self._cache.clear()
+            self._cache_hits = 0
+            self._cache_misses = 0
+
+    def classify_batch(self, tickets: List[str], threshold: float = 0.25,
+                       workers: int = 0) -> List[ClassificationResult]:
         """
         Classify multiple tickets
 
         Args:
             tickets: List of ticket texts
             threshold: Minimum confidence threshold
+            workers: Number of worker processes. With more than one worker, batches of at
+                least MIN_PARALLEL_BATCH tickets are split across processes (regex matching
+                holds the GIL, so threads would not help). Starting the pool has a fixed
+                cost, so this only pays off for large batches
 
         Returns:
             List of ClassificationResult objects
@@ -143,57 +591,154 @@ class TicketClassifier:
             raise TypeError(f"tickets must be list, not {type(tickets).__name__}")
         if not tickets:
             raise ValueError("tickets list cannot be empty")
+        if not 0.0 <= threshold <= 1.0:
+            raise ValueError(f"threshold must be between 0.0 and 1.0, got {threshold}")
+        if isinstance(workers, bool) or not isinstance(workers, int):
+            raise TypeError(f"workers must be int, not {type(workers).__name__}")
+        if workers < 0:
+            raise ValueError(f"workers must be >= 0, got {workers}")
+
+        if workers > 1 and len(tickets) >= MIN_PARALLEL_BATCH:
+            return self._classify_batch_parallel(tickets, threshold, workers)
+
+        # Threshold is validated once for the whole batch; only per-ticket
+        # type checks remain inside the loop. Identical tickets within the
+        # batch (auto-replies, forwarded alerts) are matched only once, and
+        # each distinct ticket is truncated and lowercased only once; tickets
+        # differing only in case share the lowercased lookup
+        results = []
+        batch_best = {}
+        batch_best_lower = {}
+        for ticket in tickets:
+            if ticket is None:
+                raise ValueError("ticket_text cannot be None")
+            if not isinstance(ticket, str):
+                raise TypeError(f"ticket_text must be str, not {type(ticket).__name__}")
+            best = batch_best.get(ticket)
+            if best is None:
+                ticket_lower = _prepare_text(ticket, self.normalize_whitespace)
+                best = batch_best_lower.get(ticket_lower)
+                if best is None:
+                    best = self._best_match_prelowered(ticket_lower)
+                    batch_best_lower[ticket_lower] = best
+                batch_best[ticket] = best
+            results.append(self._make_result(best, threshold))
+        return results
+
+    def _classify_batch_parallel(self, tickets: List[str], threshold: float,
+                                 workers: int) -> List[ClassificationResult]:
+        """
+        Classify a batch across worker processes
+
+        Each worker builds its own classifier from this classifier's categories
+        once, then returns ``(category_index, score, matched_patterns)`` per
+        ticket so results refer to this process's category objects.
+        """
+        unique = {}
+        for ticket in tickets:
+            if ticket is None:
+                raise ValueError("ticket_text cannot be None")
+            if not isinstance(ticket, str):
+                raise TypeError(f"ticket_text must be str, not {type(ticket).__name__}")
+            unique.setdefault(ticket, None)
+        unique_tickets = list(unique)
+
+        chunksize = max(1, len(unique_tickets) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker,
+                                 initargs=(self.categories, self.regex_engine,
+                                           self.normalize_whitespace)) as executor:
+            matches = executor.map(_best_match_in_worker, unique_tickets, chunksize=chunksize)
+            for ticket, (index, score, matched) in zip(unique_tickets, matches):
+                unique[ticket] = (self.categories[index], score, matched)
+
+        return [self._make_result(unique[ticket], threshold) for ticket in tickets]
+
+    def _count_keywords(self, text: str) -> Optional[List[float]]:
+        """
+        Count distinct keyword hits per category in a single pass
 
-        return [self.classify(ticket, threshold) for ticket in tickets]
+        Args:
+            text: Lowercase ticket text
 
-    def _calculate_score(self, text: str, category: TicketCategory) -> Tuple[float, List[str]]:
+        Returns:
+            Weighted keyword match count per category, or None if no automaton is available
+        """
+        if self._keyword_automaton is None:
+            return None
+
+        counts = [0] * len(self.categories)
+        seen = set()
+        for _, (keyword, owners) in self._keyword_automaton.iter(text):
+            if keyword not in seen:
+                seen.add(keyword)
+                for i, weight in owners:
+                    counts[i] += weight
+        return counts
+
+    def _calculate_score(self, text: str, index: int, is_ascii: bool,
+                         pattern_start: Optional[int] = 0,
+                         keyword_matches: Optional[float] = None) -> Tuple[float, List[str]]:
         """
         Calculate match score for a category
 
         Args:
             text: Lowercase ticket text
-            category: Category to match against
+            index: Index of the category to match against
+            is_ascii: Whether text is ASCII-only
+            pattern_start: Offset before which no pattern matches, or None if none can match
+            keyword_matches: Precomputed weighted keyword count, scanned here if None
 
         Returns:
             Tuple of (score, matched_patterns)
         """
-        score = 0.0
-        matched_patterns = []
+        is_other, keywords_lower, keyword_weights, unicode_plan, ascii_plan = self._match_plans[index]
 
         # Skip scoring for "other" category
-        if category.name == "other":
+        if is_other:
             return 0.0, []
 
         # Check regex patterns (higher weight)
-        pattern_matches = 0
-        for pattern in category.patterns:
-            try:
-                if re.search(pattern, text, re.IGNORECASE):
-                    pattern_matches += 1
+        matched_patterns = []
+        gate, checks = ascii_plan if is_ascii else unicode_plan
+        if pattern_start is not None:
+            start = pattern_start
+            if gate is not None:
+                match = gate.search(text, start)
+                if match is None:
+                    checks = ()
+                else:
+                    # No pattern can match before the gate's leftmost match
+                    start = match.start()
+            for pattern, compiled, literal in checks:
+                if literal is not None:
+                    found = text.find(literal, start) >= 0
+                else:
+                    found = compiled.search(text, start) is not None
+                if found:
                     matched_patterns.append(pattern)
-            except re.error as e:
-                # Skip invalid regex patterns with warning
-                logging.warning(f"Invalid regex pattern '{pattern}' in category '{category.name}': {e}")
-
-        # Check keywords (lower weight)
-        keyword_matches = 0
-        for keyword in category.keywords:
-            if keyword.lower() in text:
-                keyword_matches += 1
-
-        # Calculate weighted score
-        # Each pattern match is worth 0.5, each keyword match is worth 0.1
-        # This rewards matches without penalizing categories with many patterns
-        pattern_score = min(pattern_matches * 0.5, 1.0)
-        keyword_score = min(keyword_matches * 0.1, 0.5)
-
-        score = min(pattern_score + keyword_score, 1.0)
-
-        # Boost score if multiple matches found
-        if pattern_matches >= 2:
-            score = min(score + 0.1, 1.0)
-        if keyword_matches >= 3:
-            score = min(score + 0.05, 1.0)
+        pattern_matches = len(matched_patterns)
+
+        # Check keywords (lower weight). Counting stops once more keywords
+        # could no longer change the score; matched_patterns is part of the
+        # result, so the pattern loop above always runs to completion
+        if keyword_matches is None:
+            keyword_matches = 0
+            if pattern_matches >= _PATTERN_SATURATION:
+                pass
+            elif keyword_weights is None:
+                for keyword in keywords_lower:
+                    if keyword in text:
+                        keyword_matches += 1
+                        if keyword_matches >= _KEYWORD_SATURATION:
+                            break
+            else:
+                for keyword, weight in zip(keywords_lower, keyword_weights):
+                    if keyword in text:
+                        keyword_matches += weight
+                        if keyword_matches >= _KEYWORD_SATURATION:
+                            break
+
+        score = _combine_scores(pattern_matches, keyword_matches)
 
         return score, matched_patterns
 
@@ -209,6 +754,7 @@ class TicketClassifier:
             raise ValueError(f"Category with name '{category.name}' already exists")
 
         self.categories.append(category)
+        self._build_index()
 
     def remove_category(self, category_name: str):
         """Remove a category by name"""
@@ -232,6 +778,27 @@ class TicketClassifier:
         if not self.categories:
             raise ValueError("Cannot remove last category")
 
+        self._build_index()
+
     def get_categories(self) -> List[TicketCategory]:
         """Get all categories"""
         return self.categories.copy()
+
+
+# Per-process state for classify_batch(workers=...)
+_worker_classifier = None
+_worker_category_index = None
+
+
+def _init_batch_worker(categories: List[TicketCategory], regex_engine: str, normalize_whitespace: bool):
+    """Build the classifier a worker process uses for all of its tickets"""
+    global _worker_classifier, _worker_category_index
+    _worker_classifier = TicketClassifier(categories, cache_size=0, regex_engine=regex_engine,
+                                          normalize_whitespace=normalize_whitespace)
+    _worker_category_index = {id(category): i for i, category in enumerate(_worker_classifier.categories)}
+
+
+def _best_match_in_worker(ticket_text: str) -> Tuple[int, float, Tuple[str, ...]]:
+    """Find the best match for one ticket inside a worker process"""
+    category, score, matched = _worker_classifier._best_match_cached(ticket_text)
+    return _worker_category_index[id(category)], score, matched
@@ -2,12 +2,138 @@
 LLM-based ticket classification using OpenAI, Azure OpenAI, or local LLMs
 """
 
+import os
+import re
 import json
+import time
+import bisect
+import asyncio
+import hashlib
 import logging
-from typing import Optional, Dict, Any
-from .classifier import ClassificationResult
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List
+from .classifier import ClassificationResult, CacheInfo
 from .categories import TicketCategory, DEFAULT_CATEGORIES, get_category_by_name
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Parser for model replies; orjson.JSONDecodeError subclasses json.JSONDecodeError
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# Default number of LLM requests in flight during batch classification,
+# overridable with the OPENAI_MAX_CONCURRENCY environment variable
+DEFAULT_MAX_CONCURRENCY = 16
+
+# Upper bounds (in estimated tokens) of the length bins used to group batch
+# requests, so requests in flight together have similar sizes
+_LENGTH_BINS = (32, 64, 128, 256, 512)
+
+# Rough characters-per-token ratio for English text, used to estimate lengths
+_CHARS_PER_TOKEN = 4
+
+_SYSTEM_MESSAGE = "You are a support ticket classification system. Respond only with JSON."
+
+# Completion budget per ticket; multi-ticket prompts scale it by ticket count
+_MAX_TOKENS_PER_TICKET = 150
+
+# Batch API jobs that ended without producing results
+_BATCH_FAILED_STATUSES = ("failed", "expired", "cancelled")
+
+# Async requests answered with HTTP 429 are retried this many times, waiting
+# _RATE_LIMIT_BACKOFF seconds before the first retry and doubling each time
+_RATE_LIMIT_RETRIES = 3
+_RATE_LIMIT_BACKOFF = 1.0
+
+
+# JSON inside a markdown code fence, or failing that the outermost object/array
+_JSON_FENCE_RE = re.compile(r"```(?:json)?\s*(\{.*?\}|\[.*?\])\s*```", re.DOTALL)
+_JSON_OBJECT_RE = re.compile(r"(\{.*\}|\[.*\])", re.DOTALL)
+
+
+def _extract_json(content: str) -> str:
+    """
+    Strip markdown fences or surrounding prose from a model reply
+
+    Args:
+        content: Message content returned by the model
+
+    Returns:
+        The JSON part of the reply, or the reply unchanged if none is found
+    """
+    if content.startswith("{"):
+        return content
+    match = _JSON_FENCE_RE.search(content) or _JSON_OBJECT_RE.search(content)
+    return match.group(1) if match else content
+
+
+def _parse_json_object(content: Optional[str], source: str) -> Dict[str, Any]:
+    """
+    Parse a model reply that should be a single JSON object
+
+    Args:
+        content: Message content returned by the model
+        source: API name used in error messages
+
+    Returns:
+        Parsed JSON object
+    """
+    content = content.strip() if content else ""
+
+    # Validate response structure
+    if not content:
+        raise ValueError(f"Empty response from {source}")
+
+    # Try to parse JSON with error handling
+    try:
+        parsed = _json_loads(content)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON response from {source}: {content[:100]}") from e
+
+    # Validate response is a dictionary
+    if not isinstance(parsed, dict):
+        raise ValueError(f"Expected JSON object, got {type(parsed).__name__}")
+
+    return parsed
+
+
+def _is_rate_limited(error: BaseException) -> bool:
+    """Whether an error (or one it was raised from) is an HTTP 429 response"""
+    while error is not None:
+        status = getattr(error, "status_code", None)
+        if status is None:
+            status = getattr(getattr(error, "response", None), "status_code", None)
+        if status == 429:
+            return True
+        error = error.__cause__
+    return False
+
+
+def _order_by_length_bin(tickets: List[str]) -> List[int]:
+    """
+    Order ticket indices by estimated token-length bin
+
+    Requests dispatched together then have similar lengths, so servers that
+    batch concurrent requests (vLLM, LM Studio, Ollama) do not hold short
+    tickets back behind a long one. Order within a bin is preserved.
+    """
+    return sorted(
+        range(len(tickets)),
+        key=lambda i: bisect.bisect_left(_LENGTH_BINS, len(tickets[i]) // _CHARS_PER_TOKEN)
+    )
+
+
+def _restore_order(order: List[int], ordered_results: List[Any]) -> List[Any]:
+    """Undo _order_by_length_bin on a list of per-ticket results"""
+    results = [None] * len(order)
+    for position, index in enumerate(order):
+        results[index] = ordered_results[position]
+    return results
+
 
 class LLMClassifier:
     """
@@ -27,7 +153,9 @@ class LLMClassifier:
         provider: str = "openai",
         api_base: Optional[str] = None,
         model: str = "gpt-3.5-turbo",
-        categories: Optional[list] = None
+        categories: Optional[list] = None,
+        cache_size: int = 10000,
+        cache_ttl: float = 3600.0
     ):
         """
         Initialize LLM classifier
@@ -38,13 +166,88 @@ class LLMClassifier:
             api_base: Base URL for API (required for Azure and local LLMs)
             model: Model name to use
             categories: Custom categories (defaults to DEFAULT_CATEGORIES)
+            cache_size: Number of LLM answers kept in memory (0 disables caching)
+            cache_ttl: Seconds a cached answer stays valid
         """
+        if isinstance(cache_size, bool) or not isinstance(cache_size, int):
+            raise TypeError(f"cache_size must be int, not {type(cache_size).__name__}")
+        if cache_size < 0:
+            raise ValueError(f"cache_size must be >= 0, got {cache_size}")
+        if isinstance(cache_ttl, bool) or not isinstance(cache_ttl, (int, float)):
+            raise TypeError(f"cache_ttl must be numeric, not {type(cache_ttl).__name__}")
+        if cache_ttl <= 0:
+            raise ValueError(f"cache_ttl must be > 0, got {cache_ttl}")
+
         self.api_key = api_key
         self.provider = provider.lower()
         self.api_base = api_base
         self.model = model
         self.categories = categories if categories is not None else DEFAULT_CATEGORIES
 
+        # Answers name a category from the prompt; unknown names (and failed
+        # requests) map to "other", taken from DEFAULT_CATEGORIES when the
+        # custom categories don't define one
+        self._category_by_name = {category.name: category for category in self.categories}
+        self._other_category = self._category_by_name.get("other") or get_category_by_name("other")
+        if self._other_category is None:
+            raise ValueError("Could not find 'other' category in DEFAULT_CATEGORIES")
+
+        # Answers keyed by a hash of model and normalized ticket text; batch calls
+        # classify() from worker threads, hence the lock
+        self._cache_size = cache_size
+        self._cache_ttl = float(cache_ttl)
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
+
+        # Prompt text around the ticket(s), built once since the categories
+        # don't change per call
+        category_list = self._category_list()
+        self._prompt_prefix = f"""Classify the following support ticket into one of these categories:
+
+{category_list}
+
+Ticket: \""""
+        self._prompt_suffix = """"
+
+Respond with a JSON object containing:
+- category: the category name (exactly as listed above, or "other" if no match)
+- confidence: a number between 0 and 1 indicating confidence
+- reasoning: brief explanation of classification
+
+Example response:
+{"category": "password_reset", "confidence": 0.95, "reasoning": "User explicitly mentions forgot password"}
+
+Your response (JSON only):"""
+        self._group_prompt_prefix = f"""Classify each of the following support tickets into one of these categories:
+
+{category_list}
+
+Tickets:
+"""
+        self._group_prompt_suffix = """
+
+Respond with a JSON object containing "results": an array with one object per ticket, each containing:
+- idx: the ticket number shown in brackets
+- category: the category name (exactly as listed above, or "other" if no match)
+- confidence: a number between 0 and 1 indicating confidence
+- reasoning: brief explanation of classification
+
+Example response:
+{"results": [{"idx": 0, "category": "password_reset", "confidence": 0.95, "reasoning": "User explicitly mentions forgot password"}]}
+
+Your response (JSON only):"""
+
+        # API clients and HTTP sessions, created on first use and reused so
+        # connections stay open between requests
+        self._clients = {}
+        self._clients_lock = threading.Lock()
+        # Connections the local provider's pool keeps per host (grown to the
+        # largest batch concurrency) and the size currently mounted
+        self._http_pool_size = DEFAULT_MAX_CONCURRENCY
+        self._http_pool_mounted = 0
+
         # Validate configuration
         if self.provider in ["openai", "azure"] and not api_key:
             raise ValueError(f"{provider} provider requires an api_key")
@@ -70,195 +273,717 @@ class LLMClassifier:
         if not ticket_text.strip():
             raise ValueError("ticket_text cannot be empty")
 
+        cache_key = self._cache_key(ticket_text)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            category, confidence, matched_patterns = cached
+            return ClassificationResult._create_unchecked(category, confidence, list(matched_patterns))
+
         try:
             # Make LLM call
             response = self._call_llm(ticket_text)
+            result = self._result_from_response(response)
+            # Only successful answers are cached; errors are retried next time
+            self._cache_put(cache_key, result)
+            return result
 
-            # Validate response structure
-            if not isinstance(response, dict):
-                raise ValueError(f"LLM response must be a dict, got {type(response).__name__}")
+        except Exception as e:
+            # Fallback to "other" category on error
+            logging.warning(f"LLM classification error: {e}", exc_info=True)
+            return self._fallback_result(str(e))
 
-            # Parse and validate response fields
-            category_name = response.get("category")
-            if category_name is None:
-                category_name = "other"
-            if not isinstance(category_name, str):
-                category_name = "other"
+    async def aclassify(self, ticket_text: str) -> ClassificationResult:
+        """
+        Classify ticket using LLM without blocking the event loop
 
-            confidence = response.get("confidence")
-            if confidence is None:
-                confidence = 0.5
+        OpenAI and Azure requests use the SDK's async clients; requests that
+        are rate limited (HTTP 429) are retried with exponential backoff.
 
-            # Validate and clamp confidence value
-            try:
-                confidence = float(confidence)
-                confidence = max(0.0, min(1.0, confidence))
-            except (ValueError, TypeError):
-                confidence = 0.5
-
-            reasoning = response.get("reasoning", "")
-            if not isinstance(reasoning, str):
-                reasoning = ""
-
-            # Get category object
-            category = get_category_by_name(category_name)
-            if category is None:
-                category = get_category_by_name("other")
-
-            # Final safety check - should never happen but prevents crash
-            if category is None:
-                raise ValueError("Could not find 'other' category in DEFAULT_CATEGORIES")
-
-            return ClassificationResult(
-                category=category,
-                confidence=confidence,
-                matched_patterns=[reasoning] if reasoning else []
-            )
+        Args:
+            ticket_text: The ticket subject/description
+
+        Returns:
+            ClassificationResult
+        """
+        return await self._aclassify(ticket_text)
+
+    async def _aclassify(self, ticket_text: str, client=None) -> ClassificationResult:
+        """
+        Classify ticket using LLM, sending the request through client
+
+        Args:
+            ticket_text: The ticket subject/description
+            client: Async OpenAI/Azure client shared by a batch, or None to open one
+                for this request
+
+        Returns:
+            ClassificationResult
+        """
+        # Input validation
+        if ticket_text is None:
+            raise ValueError("ticket_text cannot be None")
+        if not isinstance(ticket_text, str):
+            raise TypeError(f"ticket_text must be str, not {type(ticket_text).__name__}")
+        if not ticket_text.strip():
+            raise ValueError("ticket_text cannot be empty")
+
+        cache_key = self._cache_key(ticket_text)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            category, confidence, matched_patterns = cached
+            return ClassificationResult._create_unchecked(category, confidence, list(matched_patterns))
+
+        try:
+            response = await self._asend_prompt(self._build_prompt(ticket_text), client=client)
+            result = self._result_from_response(response)
+            self._cache_put(cache_key, result)
+            return result
 
         except Exception as e:
             # Fallback to "other" category on error
             logging.warning(f"LLM classification error: {e}", exc_info=True)
-            other_category = get_category_by_name("other")
-            if other_category is None:
-                raise ValueError("Could not find 'other' category in DEFAULT_CATEGORIES")
-            return ClassificationResult(other_category, 0.0, [str(e)])
+            return self._fallback_result(str(e))
 
-    def _call_llm(self, ticket_text: str) -> Dict[str, Any]:
+    async def aclassify_batch(self, tickets: List[str],
+                              concurrency: Optional[int] = None) -> List[ClassificationResult]:
         """
-        Make LLM API call
+        Classify multiple tickets with native async requests
+
+        Unlike classify_batch_async(), no worker threads are used for the
+        OpenAI and Azure providers; all requests share one async client
+        (and its connection pool), closed when the batch ends, and an
+        asyncio.Semaphore bounds the requests in flight.
 
         Args:
-            ticket_text: Ticket text to classify
+            tickets: List of ticket texts
+            concurrency: Maximum requests in flight (defaults to OPENAI_MAX_CONCURRENCY or 16)
 
         Returns:
-            Dict with classification results
+            List of ClassificationResult objects, in the same order as tickets
         """
-        # Build category list for prompt
-        category_list = "\n".join([
-            f"- {cat.name}: {cat.description}"
-            for cat in self.categories if cat.name != "other"
-        ])
+        concurrency = self._prepare_batch(tickets, concurrency)
+        order = _order_by_length_bin(tickets)
+        semaphore = asyncio.Semaphore(concurrency)
 
-        prompt = f"""Classify the following support ticket into one of these categories:
+        client = None
+        if self.provider in ("openai", "azure"):
+            try:
+                client = self._async_client()
+            except ImportError:
+                # Every ticket falls back to "other" with the import error
+                client = None
 
-{category_list}
+        async def classify_bounded(ticket_text: str) -> ClassificationResult:
+            async with semaphore:
+                return await self._aclassify(ticket_text, client)
 
-Ticket: "{ticket_text}"
+        try:
+            ordered_results = await asyncio.gather(*(classify_bounded(tickets[i]) for i in order))
+        finally:
+            if client is not None:
+                await client.close()
+        return _restore_order(order, list(ordered_results))
+
+    async def _asend_prompt(self, prompt: str, max_tokens: int = _MAX_TOKENS_PER_TICKET,
+                            client=None) -> Dict[str, Any]:
+        """
+        Send a prompt to the configured provider, retrying on rate limits
 
-Respond with a JSON object containing:
-- category: the category name (exactly as listed above, or "other" if no match)
-- confidence: a number between 0 and 1 indicating confidence
-- reasoning: brief explanation of classification
+        Args:
+            prompt: User prompt
+            max_tokens: Completion token budget
+            client: Async OpenAI/Azure client to use, or None to open one for this prompt
 
-Example response:
-{{"category": "password_reset", "confidence": 0.95, "reasoning": "User explicitly mentions forgot password"}}
+        Returns:
+            Parsed JSON object from the model
+        """
+        if client is None and self.provider in ("openai", "azure"):
+            async with self._async_client() as client:
+                return await self._asend_prompt(prompt, max_tokens, client)
 
-Your response (JSON only):"""
+        delay = _RATE_LIMIT_BACKOFF
+        for attempt in range(_RATE_LIMIT_RETRIES + 1):
+            try:
+                if self.provider == "openai":
+                    return await self._acall_openai(prompt, max_tokens, client)
+                elif self.provider == "azure":
+                    return await self._acall_azure(prompt, max_tokens, client)
+                elif self.provider == "local":
+                    # requests has no async API; keep the event loop free
+                    loop = asyncio.get_running_loop()
+                    return await loop.run_in_executor(None, self._call_local, prompt, max_tokens)
+                else:
+                    raise ValueError(f"Unknown provider: {self.provider}")
+            except Exception as e:
+                if attempt == _RATE_LIMIT_RETRIES or not _is_rate_limited(e):
+                    raise
+                logging.info(f"LLM request rate limited, retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                delay *= 2
+
+    def _result_from_response(self, response: Dict[str, Any]) -> ClassificationResult:
+        """
+        Convert a parsed LLM JSON response into a ClassificationResult
 
-        if self.provider == "openai":
-            return self._call_openai(prompt)
-        elif self.provider == "azure":
-            return self._call_azure(prompt)
-        elif self.provider == "local":
-            return self._call_local(prompt)
-        else:
-            raise ValueError(f"Unknown provider: {self.provider}")
+        Args:
+            response: Parsed JSON object returned by the model
 
-    def _call_openai(self, prompt: str) -> Dict[str, Any]:
-        """Call OpenAI API (using v1.x API)"""
+        Returns:
+            ClassificationResult
+        """
+        # Validate response structure
+        if not isinstance(response, dict):
+            raise ValueError(f"LLM response must be a dict, got {type(response).__name__}")
+
+        # Parse and validate response fields
+        category_name = response.get("category")
+        if category_name is None:
+            category_name = "other"
+        if not isinstance(category_name, str):
+            category_name = "other"
+
+        confidence = response.get("confidence")
+        if confidence is None:
+            confidence = 0.5
+
+        # Validate and clamp confidence value
         try:
-            from openai import OpenAI
-        except ImportError as e:
-            raise ImportError("openai package required. Install with: pip install openai>=1.0.0") from e
+            confidence = float(confidence)
+            confidence = max(0.0, min(1.0, confidence))
+        except (ValueError, TypeError):
+            confidence = 0.5
+
+        reasoning = response.get("reasoning", "")
+        if not isinstance(reasoning, str):
+            reasoning = ""
+
+        # Get category object
+        category = self._category_by_name.get(category_name) or self._other_category
+
+        return ClassificationResult._create_unchecked(category, confidence, [reasoning] if reasoning else [])
+
+    def _cache_key(self, ticket_text: str) -> bytes:
+        """
+        Hash the inputs that determine the LLM answer
+
+        Case and runs of whitespace are ignored, so "Forgot  password" and
+        "forgot password" share one cached answer.
+        """
+        normalized = " ".join(ticket_text.lower().split())
+        payload = f"{self.model}\0{normalized}".encode("utf-8")
+        return hashlib.blake2b(payload, digest_size=16).digest()
+
+    def _cache_get(self, key: bytes):
+        """Return a cached (category, confidence, matched_patterns) entry, or None"""
+        if not self._cache_size:
+            return None
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._cache[key]
+                self._cache_misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self._cache_hits += 1
+            return entry[1:]
+
+    def _cache_put(self, key: bytes, result: ClassificationResult):
+        """Store a result, evicting the least recently used entry if full"""
+        if not self._cache_size:
+            return
+        entry = (time.monotonic() + self._cache_ttl, result.category, result.confidence,
+                 tuple(result.matched_patterns))
+        with self._cache_lock:
+            self._cache[key] = entry
+            self._cache.move_to_end(key)
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+    def cache_info(self) -> CacheInfo:
+        """Get response cache statistics (hits, misses, maxsize, currsize)"""
+        with self._cache_lock:
+            return CacheInfo(self._cache_hits, self._cache_misses, self._cache_size, len(self._cache))
+
+    def cache_clear(self):
+        """Clear cached LLM answers and reset statistics"""
+        with self._cache_lock:
+            self._cache.clear()
+            self._cache_hits = 0
+            self._cache_misses = 0
+
+    def _fallback_result(self, message: str) -> ClassificationResult:
+        """Build the "other" result returned when classification fails"""
+        return ClassificationResult._create_unchecked(self._other_category, 0.0, [message])
+
+    def classify_batch(self, tickets: List[str], concurrency: Optional[int] = None,
+                       batch_size: int = 1) -> List[ClassificationResult]:
+        """
+        Classify multiple tickets with concurrent LLM requests
+
+        Args:
+            tickets: List of ticket texts
+            concurrency: Maximum requests in flight (defaults to OPENAI_MAX_CONCURRENCY or 16)
+            batch_size: Tickets classified per request. Larger values send the category
+                list once per group and need fewer requests, but may lower per-ticket accuracy
+
+        Returns:
+            List of ClassificationResult objects, in the same order as tickets
+        """
+        concurrency = self._prepare_batch(tickets, concurrency, batch_size)
+        order = _order_by_length_bin(tickets)
+        groups = self._group_tickets([tickets[i] for i in order], batch_size)
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            grouped_results = list(executor.map(self._classify_group, groups))
+        return _restore_order(order, [result for group in grouped_results for result in group])
+
+    async def classify_batch_async(self, tickets: List[str], concurrency: Optional[int] = None,
+                                   batch_size: int = 1) -> List[ClassificationResult]:
+        """
+        Classify multiple tickets concurrently from within an event loop
 
+        Blocking LLM calls run in worker threads, so the event loop stays free.
+
+        Args:
+            tickets: List of ticket texts
+            concurrency: Maximum requests in flight (defaults to OPENAI_MAX_CONCURRENCY or 16)
+            batch_size: Tickets classified per request (see classify_batch)
+
+        Returns:
+            List of ClassificationResult objects, in the same order as tickets
+        """
+        concurrency = self._prepare_batch(tickets, concurrency, batch_size)
+        order = _order_by_length_bin(tickets)
+        groups = self._group_tickets([tickets[i] for i in order], batch_size)
+        # Not a "with" block: its exit would wait on the loop thread for
+        # requests still running after a cancellation. Groups not started yet
+        # are cancelled by hand (shutdown(cancel_futures=True) needs 3.9)
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        futures = [executor.submit(self._classify_group, group) for group in groups]
         try:
-            client = OpenAI(api_key=self.api_key)
-            response = client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a support ticket classification system. Respond only with JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=150,
-                timeout=30.0
-            )
+            grouped_results = await asyncio.gather(*(asyncio.wrap_future(future) for future in futures))
+        finally:
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+        return _restore_order(order, [result for group in grouped_results for result in group])
+
+    @staticmethod
+    def _group_tickets(tickets: List[str], batch_size: int) -> List[List[str]]:
+        """Split tickets into consecutive groups of at most batch_size"""
+        return [tickets[i:i + batch_size] for i in range(0, len(tickets), batch_size)]
+
+    def _classify_group(self, tickets: List[str]) -> List[ClassificationResult]:
+        """
+        Classify a group of tickets with a single LLM request
 
-            content = response.choices[0].message.content.strip()
+        Cached tickets are answered from the cache and left out of the prompt.
+        Tickets missing from the model's answer fall back to "other".
 
-            # Validate response structure
-            if not content:
-                raise ValueError("Empty response from OpenAI API")
+        Args:
+            tickets: Validated ticket texts
 
-            # Try to parse JSON with error handling
+        Returns:
+            List of ClassificationResult objects, in the same order as tickets
+        """
+        if len(tickets) == 1:
+            return [self.classify(tickets[0])]
+
+        results = [None] * len(tickets)
+        pending = []
+        for i, ticket in enumerate(tickets):
+            cache_key = self._cache_key(ticket)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                category, confidence, matched_patterns = cached
+                results[i] = ClassificationResult._create_unchecked(category, confidence, list(matched_patterns))
+            else:
+                pending.append((i, cache_key))
+
+        if pending:
             try:
-                parsed = json.loads(content)
-            except json.JSONDecodeError as e:
-                raise ValueError(f"Invalid JSON response from OpenAI: {content[:100]}") from e
+                prompt = self._build_group_prompt([tickets[i] for i, _ in pending])
+                response = self._send_prompt(prompt, _MAX_TOKENS_PER_TICKET * len(pending))
+                answers = response.get("results")
+                if not isinstance(answers, list):
+                    raise ValueError(f"LLM response 'results' must be a list, got {type(answers).__name__}")
+            except Exception as e:
+                logging.warning(f"LLM classification error: {e}", exc_info=True)
+                answers = []
+                error = str(e)
+            else:
+                error = "No result returned for this ticket"
+
+            for answer in answers:
+                if not isinstance(answer, dict):
+                    continue
+                position = answer.get("idx")
+                if isinstance(position, bool) or not isinstance(position, int) or not 0 <= position < len(pending):
+                    continue
+                index, cache_key = pending[position]
+                if results[index] is not None:
+                    continue
+                try:
+                    results[index] = self._result_from_response(answer)
+                except Exception as e:
+                    logging.warning(f"LLM result for ticket {position} could not be parsed: {e}")
+                    continue
+                self._cache_put(cache_key, results[index])
+
+            for index, _ in pending:
+                if results[index] is None:
+                    results[index] = self._fallback_result(error)
+
+        return results
+
+    def _prepare_batch(self, tickets: List[str], concurrency: Optional[int], batch_size: int = 1) -> int:
+        """
+        Validate a batch up front so no worker fails on bad input
 
-            # Validate response is a dictionary
-            if not isinstance(parsed, dict):
-                raise ValueError(f"Expected JSON object, got {type(parsed).__name__}")
+        Returns:
+            Effective concurrency
+        """
+        if tickets is None:
+            raise ValueError("tickets cannot be None")
+        if not isinstance(tickets, list):
+            raise TypeError(f"tickets must be list, not {type(tickets).__name__}")
+        if not tickets:
+            raise ValueError("tickets list cannot be empty")
+        for ticket in tickets:
+            if ticket is None:
+                raise ValueError("ticket_text cannot be None")
+            if not isinstance(ticket, str):
+                raise TypeError(f"ticket_text must be str, not {type(ticket).__name__}")
+            if not ticket.strip():
+                raise ValueError("ticket_text cannot be empty")
+
+        if concurrency is None:
+            env_value = os.environ.get("OPENAI_MAX_CONCURRENCY")
+            try:
+                concurrency = int(env_value) if env_value else DEFAULT_MAX_CONCURRENCY
+            except ValueError:
+                logging.warning(f"Ignoring invalid OPENAI_MAX_CONCURRENCY value '{env_value}'")
+                concurrency = DEFAULT_MAX_CONCURRENCY
+        if isinstance(concurrency, bool) or not isinstance(concurrency, int):
+            raise TypeError(f"concurrency must be int, not {type(concurrency).__name__}")
+        if concurrency < 1:
+            raise ValueError(f"concurrency must be >= 1, got {concurrency}")
+        if isinstance(batch_size, bool) or not isinstance(batch_size, int):
+            raise TypeError(f"batch_size must be int, not {type(batch_size).__name__}")
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be >= 1, got {batch_size}")
+
+        concurrency = min(concurrency, -(-len(tickets) // batch_size))
+        # The local provider's connection pool must hold one connection per
+        # worker, or urllib3 discards the extras ("Connection pool is full")
+        if concurrency > self._http_pool_size:
+            self._http_pool_size = concurrency
+        return concurrency
+
+    def submit_batch(self, tickets: List[str]) -> str:
+        """
+        Submit tickets to the OpenAI Batch API for offline classification
 
-            return parsed
+        Batch jobs complete within 24 hours at a lower price than realtime
+        requests. Collect the results with poll_batch().
+
+        Args:
+            tickets: List of ticket texts
+
+        Returns:
+            Batch ID
+        """
+        if self.provider != "openai":
+            raise ValueError(f"Batch API is only supported for the openai provider, not {self.provider}")
+        self._prepare_batch(tickets, 1)
+
+        lines = []
+        for i, ticket in enumerate(tickets):
+            lines.append(json.dumps({
+                "custom_id": str(i),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self.model,
+                    "messages": [
+                        {"role": "system", "content": _SYSTEM_MESSAGE},
+                        {"role": "user", "content": self._build_prompt(ticket)}
+                    ],
+                    "temperature": 0.3,
+                    "max_tokens": _MAX_TOKENS_PER_TICKET
+                }
+            }))
+
+        try:
+            client = self._openai_client()
+            batch_file = client.files.create(
+                file=("tickets.jsonl", "\n".join(lines).encode("utf-8")),
+                purpose="batch"
+            )
+            batch = client.batches.create(
+                input_file_id=batch_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h"
+            )
+            return batch.id
 
         except Exception as e:
-            # Re-raise with context
-            raise RuntimeError(f"OpenAI API call failed: {str(e)}") from e
+            raise RuntimeError(f"OpenAI batch submission failed: {str(e)}") from e
 
-    def _call_azure(self, prompt: str) -> Dict[str, Any]:
-        """Call Azure OpenAI API (using v1.x API)"""
+    def poll_batch(self, batch_id: str) -> Optional[List[ClassificationResult]]:
+        """
+        Fetch the results of a batch submitted with submit_batch()
+
+        Args:
+            batch_id: ID returned by submit_batch()
+
+        Returns:
+            List of ClassificationResult objects in submission order, or None
+            if the batch has not completed yet. Tickets whose request failed
+            are returned as "other" with the error as matched pattern.
+        """
+        if self.provider != "openai":
+            raise ValueError(f"Batch API is only supported for the openai provider, not {self.provider}")
+        if not isinstance(batch_id, str) or not batch_id:
+            raise ValueError("batch_id must be a non-empty str")
+
+        try:
+            client = self._openai_client()
+            batch = client.batches.retrieve(batch_id)
+            if batch.status in _BATCH_FAILED_STATUSES:
+                raise RuntimeError(f"Batch {batch_id} ended with status '{batch.status}'")
+            if batch.status != "completed":
+                return None
+
+            output = client.files.content(batch.output_file_id).text if batch.output_file_id else ""
+            total = batch.request_counts.total
+
+        except Exception as e:
+            raise RuntimeError(f"OpenAI batch retrieval failed: {str(e)}") from e
+
+        results = {}
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            try:
+                record = _json_loads(line)
+                index = int(record["custom_id"])
+            except Exception as e:
+                # Without a readable custom_id the line can't be matched to a
+                # ticket; that ticket gets the "no result" fallback below
+                logging.warning(f"Skipping unreadable LLM batch output line: {e}")
+                continue
+            try:
+                body = record["response"]["body"]
+                content = body["choices"][0]["message"]["content"].strip()
+                results[index] = self._result_from_response(_json_loads(content))
+            except Exception as e:
+                logging.warning(f"LLM batch result {index} could not be parsed: {e}")
+                results[index] = self._fallback_result(str(e))
+
+        return [
+            results.get(i) or self._fallback_result("No result returned for this ticket")
+            for i in range(total)
+        ]
+
+    def _shared_client(self, kind: str, factory):
+        """Return the client stored under kind, creating it with factory() on first use"""
+        client = self._clients.get(kind)
+        if client is None:
+            with self._clients_lock:
+                client = self._clients.get(kind)
+                if client is None:
+                    client = self._clients[kind] = factory()
+        return client
+
+    def _openai_client(self):
+        """Shared OpenAI client for the configured API key"""
+        try:
+            from openai import OpenAI
+        except ImportError as e:
+            raise ImportError("openai package required. Install with: pip install openai>=1.0.0") from e
+
+        return self._shared_client("openai", lambda: OpenAI(api_key=self.api_key))
+
+    def _azure_client(self):
+        """Shared Azure OpenAI client for the configured endpoint"""
         try:
             from openai import AzureOpenAI
         except ImportError as e:
             raise ImportError("openai package required. Install with: pip install openai>=1.0.0") from e
 
+        return self._shared_client("azure", lambda: AzureOpenAI(
+            api_key=self.api_key,
+            api_version="2023-05-15",
+            azure_endpoint=self.api_base
+        ))
+
+    def _async_client(self):
+        """
+        Create an async OpenAI or Azure OpenAI client for the configured provider
+
+        Unlike the sync clients these are not kept on the instance: their
+        connections belong to the event loop they were opened in. Callers
+        close them (``await client.close()`` or ``async with``).
+        """
         try:
-            client = AzureOpenAI(
+            from openai import AsyncAzureOpenAI, AsyncOpenAI
+        except ImportError as e:
+            raise ImportError("openai package required. Install with: pip install openai>=1.0.0") from e
+
+        if self.provider == "azure":
+            return AsyncAzureOpenAI(
                 api_key=self.api_key,
                 api_version="2023-05-15",
                 azure_endpoint=self.api_base
             )
+        return AsyncOpenAI(api_key=self.api_key)
 
-            response = client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a support ticket classification system. Respond only with JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=150,
-                timeout=30.0
-            )
+    def _http_session(self):
+        """Shared requests session for the local provider, pooling connections"""
+        try:
+            import requests
+            from requests.adapters import HTTPAdapter
+        except ImportError as e:
+            raise ImportError("requests package required. Install with: pip install requests") from e
 
-            content = response.choices[0].message.content.strip()
+        session = self._shared_client("local", requests.Session)
+        if self._http_pool_mounted < self._http_pool_size:
+            with self._clients_lock:
+                pool_size = self._http_pool_size
+                if self._http_pool_mounted < pool_size:
+                    # Requests already in flight keep using the old adapter
+                    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=pool_size)
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    self._http_pool_mounted = pool_size
+        return session
 
-            # Validate response structure
-            if not content:
-                raise ValueError("Empty response from Azure OpenAI API")
+    def _call_llm(self, ticket_text: str) -> Dict[str, Any]:
+        """
+        Make LLM API call
 
-            # Try to parse JSON with error handling
-            try:
-                parsed = json.loads(content)
-            except json.JSONDecodeError as e:
-                raise ValueError(f"Invalid JSON response from Azure: {content[:100]}") from e
+        Args:
+            ticket_text: Ticket text to classify
 
-            # Validate response is a dictionary
-            if not isinstance(parsed, dict):
-                raise ValueError(f"Expected JSON object, got {type(parsed).__name__}")
+        Returns:
+            Dict with classification results
+        """
+        return self._send_prompt(self._build_prompt(ticket_text))
 
-            return parsed
+    def _send_prompt(self, prompt: str, max_tokens: int = _MAX_TOKENS_PER_TICKET) -> Dict[str, Any]:
+        """
+        Send a prompt to the configured provider
+
+        Args:
+            prompt: User prompt
+            max_tokens: Completion token budget
+
+        Returns:
+            Parsed JSON object from the model
+        """
+        if self.provider == "openai":
+            return self._call_openai(prompt, max_tokens)
+        elif self.provider == "azure":
+            return self._call_azure(prompt, max_tokens)
+        elif self.provider == "local":
+            return self._call_local(prompt, max_tokens)
+        else:
+            raise ValueError(f"Unknown provider: {self.provider}")
+
+    def _build_prompt(self, ticket_text: str) -> str:
+        """
+        Build the classification prompt for a single ticket
+
+        Args:
+            ticket_text: Ticket text to classify
+
+        Returns:
+            Prompt string
+        """
+        return self._prompt_prefix + ticket_text + self._prompt_suffix
+
+    def _build_group_prompt(self, tickets: List[str]) -> str:
+        """
+        Build one classification prompt for several tickets
+
+        Args:
+            tickets: Ticket texts, referred to by their position
+
+        Returns:
+            Prompt string
+        """
+        ticket_list = "\n".join(f'[{i}] "{ticket}"' for i, ticket in enumerate(tickets))
+        return self._group_prompt_prefix + ticket_list + self._group_prompt_suffix
+
+    def _category_list(self) -> str:
+        """Category names and descriptions, one per line, for prompts"""
+        return "\n".join([
+            f"- {cat.name}: {cat.description}"
+            for cat in self.categories if cat.name != "other"
+        ])
+
+    def _call_openai(self, prompt: str, max_tokens: int = _MAX_TOKENS_PER_TICKET) -> Dict[str, Any]:
+        """Call OpenAI API (using v1.x API)"""
+        client = self._openai_client()
+
+        try:
+            response = client.chat.completions.create(**self._chat_request(prompt, max_tokens))
+            return _parse_json_object(response.choices[0].message.content, "OpenAI API")
+
+        except Exception as e:
+            # Re-raise with context
+            raise RuntimeError(f"OpenAI API call failed: {str(e)}") from e
+
+    async def _acall_openai(self, prompt: str, max_tokens: int, client) -> Dict[str, Any]:
+        """Call OpenAI API with an async client from _async_client()"""
+        try:
+            response = await client.chat.completions.create(**self._chat_request(prompt, max_tokens))
+            return _parse_json_object(response.choices[0].message.content, "OpenAI API")
+
+        except Exception as e:
+            # Re-raise with context
+            raise RuntimeError(f"OpenAI API call failed: {str(e)}") from e
+
+    def _call_azure(self, prompt: str, max_tokens: int = _MAX_TOKENS_PER_TICKET) -> Dict[str, Any]:
+        """Call Azure OpenAI API (using v1.x API)"""
+        client = self._azure_client()
+
+        try:
+            response = client.chat.completions.create(**self._chat_request(prompt, max_tokens))
+            return _parse_json_object(response.choices[0].message.content, "Azure OpenAI API")
 
         except Exception as e:
             # Re-raise with context
             raise RuntimeError(f"Azure OpenAI API call failed: {str(e)}") from e
 
-    def _call_local(self, prompt: str) -> Dict[str, Any]:
-        """Call local LLM (LM Studio, Ollama, etc.)"""
+    async def _acall_azure(self, prompt: str, max_tokens: int, client) -> Dict[str, Any]:
+        """Call Azure OpenAI API with an async client from _async_client()"""
         try:
-            import requests
-        except ImportError as e:
-            raise ImportError("requests package required. Install with: pip install requests") from e
+            response = await client.chat.completions.create(**self._chat_request(prompt, max_tokens))
+            return _parse_json_object(response.choices[0].message.content, "Azure OpenAI API")
+
+        except Exception as e:
+            # Re-raise with context
+            raise RuntimeError(f"Azure OpenAI API call failed: {str(e)}") from e
+
+    def _chat_request(self, prompt: str, max_tokens: int) -> Dict[str, Any]:
+        """Keyword arguments for chat.completions.create() shared by OpenAI and Azure"""
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": _SYSTEM_MESSAGE},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.3,
+            "max_tokens": max_tokens,
+            "timeout": 30.0,
+        }
+
+    def _call_local(self, prompt: str, max_tokens: int = _MAX_TOKENS_PER_TICKET) -> Dict[str, Any]:
+        """Call local LLM (LM Studio, Ollama, etc.)"""
+        session = self._http_session()
+        from requests import RequestException
 
         try:
             api_url = self.api_base or "http://127.0.0.1:1234/v1"
@@ -280,16 +1005,16 @@ Your response (JSON only):"""
                 # localhost HTTP is acceptable for development
                 verify_ssl = False
 
-            response = requests.post(
+            response = session.post(
                 f"{api_url}/chat/completions",
                 json={
                     "model": self.model,
                     "messages": [
-                        {"role": "system", "content": "You are a support ticket classification system. Respond only with JSON."},
+                        {"role": "system", "content": _SYSTEM_MESSAGE},
                         {"role": "user", "content": prompt}
                     ],
                     "temperature": 0.3,
-                    "max_tokens": 150
+                    "max_tokens": max_tokens
                 },
                 timeout=30,
                 verify=verify_ssl
@@ -299,7 +1024,7 @@ Your response (JSON only):"""
 
             # Validate response structure
             try:
-                response_data = response.json()
+                response_data = _json_loads(response.content)
             except ValueError as e:
                 raise ValueError(f"Invalid JSON response from local LLM API: {response.text[:100]}") from e
 
@@ -319,15 +1044,12 @@ Your response (JSON only):"""
             if not content:
                 raise ValueError("Empty response content from local LLM")
 
-            # Try to extract JSON if wrapped in markdown
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0].strip()
-            elif "```" in content:
-                content = content.split("```")[1].split("```")[0].strip()
+            # Try to extract JSON if wrapped in markdown or prose
+            content = _extract_json(content)
 
             # Try to parse JSON with error handling
             try:
-                parsed = json.loads(content)
+                parsed = _json_loads(content)
             except json.JSONDecodeError as e:
                 raise ValueError(f"Invalid JSON response from local LLM: {content[:100]}") from e
 
@@ -337,7 +1059,7 @@ Your response (JSON only):"""
 
             return parsed
 
-        except requests.RequestException as e:
+        except RequestException as e:
             raise RuntimeError(f"Local LLM API request failed: {str(e)}") from e
         except Exception as e:
             # Re-raise with context for any other errors